@@ -1,5 +1,5 @@
-import pygame
 from pygame.sprite import Sprite
+from assets import Assets
 
 
 class Alien(Sprite):
@@ -14,9 +14,15 @@ class Alien(Sprite):
         self.settings = ai_game.settings
         self.screen_rect = ai_game.screen.get_rect()
 
-        # Load the alien image and save its rect attribute.
-        self.image = pygame.image.load('images/alien.bmp')
+        # Get the shared alien image and save its rect attribute.
+        self.image = Assets.image('images/alien.bmp')
+        # Only pixel perfect collisions need the mask
+        self.mask = Assets.mask('images/alien.bmp') if self.settings.pixel_perfect_collisions else None
         self.rect = self.image.get_rect()
+        self.reset()
+
+    def reset(self):
+        """Place the alien back at its starting position so it can be reused in a new fleet."""
 
         # Initially position each new alien near the top left of the screen.
         self.rect.x = self.rect.width
@@ -26,11 +32,16 @@ class Alien(Sprite):
         self.x = float(self.rect.x)
         self.y = float(self.rect.y)
 
-    def update(self):
-        """Update the position based on the movement direction."""
+        # Position within the fleet formation
+        self.column = 0
+        self.row = 0
+
+    def update(self, dt=1.0):
+        """Update the position based on the movement direction.
+           dt is the elapsed time in frames at the reference frame rate."""
 
         # Find the new horizontal position based on float calculations
-        self.x += self.settings.alien_speed * self.settings.fleet_direction
+        self.x += self.settings.alien_speed * self.settings.fleet_direction * dt
 
         # update rect object from self.x
         self.rect.x = self.x
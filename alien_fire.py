@@ -0,0 +1,138 @@
+import numpy as np
+import pygame
+from assets import Assets
+from fleet import round_like_rect
+
+
+class AlienShots:
+    """A class to hold every shot fired by the aliens as NumPy arrays (struct-of-arrays)
+       instead of one sprite per shot.
+
+       Each shot has a position, a velocity, and an alive flag.  Moving every shot, culling the
+       ones that left the screen, and testing them all against the ship are each a single vectorized
+       operation, so thousands of shots at high levels cost about as much as a few.
+       Slots of dead shots are reused by new ones, and the arrays only grow when every slot is in use."""
+
+    def __init__(self, ai_game, capacity=64):
+        """Initialize room for capacity shots and make the shared shot image."""
+
+        # Shortcut variables to main gaming object
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+        self.screen_rect = ai_game.screen.get_rect()
+
+        # Every shot looks the same, so they all share one image
+        self.width, self.height = self.settings.alien_shot_width, self.settings.alien_shot_height
+        self.image = pygame.Surface((self.width, self.height))
+        self.image.fill(self.settings.alien_shot_color)
+        # Only pixel perfect collisions need the mask
+        self.mask = (Assets.solid_mask((self.width, self.height))
+                     if self.settings.pixel_perfect_collisions else None)
+
+        self.capacity = capacity
+        self.empty()
+
+    def empty(self):
+        """Remove every shot."""
+
+        self.x = np.zeros(self.capacity)   # Exact position of the top left corner as floats
+        self.y = np.zeros(self.capacity)
+        self.vx = np.zeros(self.capacity)  # Velocity in pixels per frame at the reference frame rate
+        self.vy = np.zeros(self.capacity)
+        self.alive = np.zeros(self.capacity, dtype=bool)
+        self.count = 0                     # Number of shots alive
+
+    def __len__(self):
+        """Return the number of shots alive."""
+        return self.count
+
+    def _grow(self, needed):
+        """Make room for at least needed shots, keeping the shots alive in their slots."""
+
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        extra = capacity - self.capacity
+        self.x = np.concatenate((self.x, np.zeros(extra)))
+        self.y = np.concatenate((self.y, np.zeros(extra)))
+        self.vx = np.concatenate((self.vx, np.zeros(extra)))
+        self.vy = np.concatenate((self.vy, np.zeros(extra)))
+        self.alive = np.concatenate((self.alive, np.zeros(extra, dtype=bool)))
+        self.capacity = capacity
+
+    def fire(self, x, y, vx, vy):
+        """Add shots centered on x with their tops at y (arrays, one value per shot) moving at (vx, vy)."""
+
+        number = len(x)
+        if self.count + number > self.capacity:
+            self._grow(self.count + number)
+        slots = np.flatnonzero(~self.alive)[:number]
+        self.x[slots] = np.asarray(x) - self.width / 2
+        self.y[slots] = y
+        self.vx[slots] = vx
+        self.vy[slots] = vy
+        self.alive[slots] = True
+        self.count += number
+
+    def update(self, dt=1.0):
+        """Move every shot and get rid of the ones that left the screen.
+           dt is the elapsed time in frames at the reference frame rate."""
+
+        if not self.count:
+            return
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+        self.alive &= ((self.y < self.screen_rect.bottom) & (self.x + self.width > 0)
+                       & (self.x < self.screen_rect.right))
+        self.count = int(np.count_nonzero(self.alive))
+
+    def _rects(self):
+        """Return the rect positions of the shots (what Rect.x and Rect.y would be)."""
+        return round_like_rect(self.x), round_like_rect(self.y)
+
+    def hit(self, rect, mask=None):
+        """Remove the shots overlapping rect (same test as Rect.colliderect), and also overlapping
+           mask placed at rect if a mask is given. Returns true if any did."""
+
+        if not self.count:
+            return False
+        rect_x, rect_y = self._rects()
+        hits = (self.alive
+                & (rect_x < rect.right) & (rect_x + self.width > rect.left)
+                & (rect_y < rect.bottom) & (rect_y + self.height > rect.top))
+        if mask is not None and hits.any():
+            for index in np.flatnonzero(hits).tolist():
+                offset = (int(rect_x[index]) - rect.x, int(rect_y[index]) - rect.y)
+                hits[index] = mask.overlap(self.mask, offset) is not None
+        number = int(np.count_nonzero(hits))
+        if number:
+            self.alive &= ~hits
+            self.count -= number
+        return bool(number)
+
+    def draw(self, surface):
+        """Draw every shot onto the surface. Returns the list of areas drawn."""
+
+        if not self.count:
+            return []
+        rect_x, rect_y = self._rects()
+        positions = zip(rect_x[self.alive].tolist(), rect_y[self.alive].tolist())
+        return surface.blits([(self.image, position) for position in positions])
+
+    def state(self):
+        """Return a copy of the shots alive, e.g. for a snapshot."""
+
+        alive = self.alive
+        return self.x[alive].copy(), self.y[alive].copy(), self.vx[alive].copy(), self.vy[alive].copy()
+
+    def set_state(self, state):
+        """Replace every shot with the shots of a copy made by state."""
+
+        x, y, vx, vy = state
+        self.empty()
+        if len(x) > self.capacity:
+            self._grow(len(x))
+        number = len(x)
+        self.x[:number], self.y[:number], self.vx[:number], self.vy[:number] = x, y, vx, vy
+        self.alive[:number] = True
+        self.count = number
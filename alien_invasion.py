@@ -4,91 +4,370 @@
 # Uploaded to Github 2020-05-04
 
 import sys
+import copy
+import time
 import pygame
-from time import sleep
+import numpy as np
+from collections import deque
 from settings import Settings
 from game_stats import GameStats
 from ship import Ship
 from bullet import Bullet
 from alien import Alien
+from fleet import ArrayFleet
+from fleet import FleetBounds
+from fleet import FleetImage
+from alien_fire import AlienShots
+from spatial_hash import SpatialHash
+from sprite_pool import SpritePool
 from button import Button
 from button import MultiLineMessage
 from scoreboard import Scoreboard
+from scoreboard import HeadlessScoreboard
+from sound_manager import SoundManager
+from sound_manager import NullSoundManager
+from renderer import FullRedrawRenderer
+from renderer import DirtyRectRenderer
+from overlay import Overlay
+from tick_input import TickInput
+from input_pipeline import InputPipeline
+from replay import ReplayRecorder
+from snapshot import GameSnapshot
+from profiler import FrameProfiler
+from profiler import NullProfiler
+from profiler import StartupTimer
+from telemetry import TelemetryServer
+from telemetry import NullTelemetry
 from color_dictionary import ColorDictionary as cc
 
 
 class AlienInvasion:
 	"""Overall class to manage game assets and behavior."""
 
-	def __init__(self):
-		"""Initialize the game, and create game resources."""
+	def __init__(self, settings=None):
+		"""Initialize the game, and create game resources.
+		   An optional Settings instance can be passed in to customize the game."""
 
-		self.settings = Settings()  # Global game settings
+		self.startup = StartupTimer()  # Time taken by each phase of startup
+		self.settings = settings if settings else Settings()  # Global game settings
+		self.headless = self.settings.headless_mode
 
-		# Initialize pygame and create gaming surface window
-		pygame.init()
-		if self.settings.full_screen_mode:
-			self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
-			self.settings.screen_width = self.screen.get_rect().width
-			self.settings.screen_height = self.screen.get_rect().height
+		# Each tick of the game logic covers this many frames at the reference frame rate
+		self.tick_dt = self.settings.reference_fps / self.settings.ticks_per_second
+
+		# Initialize the parts of pygame needed and create gaming surface window
+		# (the sound mixer is initialized in the background with the sounds, see below).
+		# In headless mode, the game is played on an off-screen surface and pygame is not initialized.
+		if self.headless:
+			self.screen = pygame.Surface((self.settings.screen_width, self.settings.screen_height))
+		else:
+			pygame.display.init()
+			pygame.font.init()
+			if self.settings.full_screen_mode and self.settings.full_screen_scaling == 'native':
+				self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+				self.settings.screen_width = self.screen.get_rect().width
+				self.settings.screen_height = self.screen.get_rect().height
+			elif self.settings.full_screen_mode and self.settings.full_screen_scaling == 'scaled':
+				# The game is drawn at screen_width x screen_height and scaled up to the monitor by SDL
+				# (on the graphics card where available), so it plays and costs the same on every monitor
+				self.screen = pygame.display.set_mode((self.settings.screen_width, self.settings.screen_height),
+													  pygame.FULLSCREEN | pygame.SCALED)
+			elif self.settings.full_screen_mode:
+				raise ValueError(f"Unknown full screen scaling: {self.settings.full_screen_scaling!r}")
+			else:
+				self.screen = pygame.display.set_mode((self.settings.screen_width, self.settings.screen_height))
+			pygame.display.set_caption("Alien Invasion MFs!")
+		self.screen_rect = self.screen.get_rect()
+		self.startup.mark('display')
+
+		# Choose how frames are put on the screen
+		if self.settings.render_mode == 'dirty':
+			self.renderer = DirtyRectRenderer(self)
+		elif self.settings.render_mode == 'full':
+			self.renderer = FullRedrawRenderer(self)
 		else:
-			self.screen = pygame.display.set_mode((self.settings.screen_width, self.settings.screen_height))
-		pygame.display.set_caption("Alien Invasion MFs!")
+			raise ValueError(f"Unknown render mode: {self.settings.render_mode!r}")
 
 		# Create an instance to store game statistics,
 		# and create a scoreboard.
 		self.stats = GameStats(self)
-		self.sb = Scoreboard(self)
+		self.sb = HeadlessScoreboard(self) if self.headless else Scoreboard(self)
 
 		# Create ship, bullets, and alien sprites
+		# Bullets and aliens are recycled through pools instead of being created for each shot/fleet
 		self.ship = Ship(self)
+		self.bullet_pool = SpritePool(lambda: Bullet(self))
+		self.alien_pool = SpritePool(lambda: Alien(self))
 		self.bullets = pygame.sprite.Group()
-		self.aliens = pygame.sprite.Group()
+		if self.settings.fleet_backend == 'array':
+			self.aliens = ArrayFleet(self)
+		elif self.settings.fleet_backend == 'sprite':
+			self.aliens = pygame.sprite.Group()
+		else:
+			raise ValueError(f"Unknown fleet backend: {self.settings.fleet_backend!r}")
+		self.array_fleet = self.settings.fleet_backend == 'array'
+
+		# The array fleet tests collisions with vectorized operations,
+		# the sprite fleet can use a grid broadphase to only test nearby aliens.
+		if self.settings.collision_broadphase not in ('grid', 'brute', 'compare'):
+			raise ValueError(f"Unknown collision broadphase: {self.settings.collision_broadphase!r}")
+		self.use_alien_grid = not self.array_fleet and self.settings.collision_broadphase != 'brute'
+		# Sprites that overlap by rect can be checked pixel by pixel with their shared masks
+		self.pixel_perfect = self.settings.pixel_perfect_collisions
+		self.collided = self._collide_pixels if self.pixel_perfect else None
+		self.alien_grid = SpatialHash(self.settings.collision_grid_cell_size)
+		self.fleet_bounds = FleetBounds()  # Outer edges of the sprite fleet
+		self.fleet_formation = (0, 0)      # Number of columns and rows of aliens in a new fleet
+
+		# Draw the aliens one by one, or the whole fleet as one pre-composited image
+		if self.settings.fleet_draw_mode not in ('sprites', 'composite'):
+			raise ValueError(f"Unknown fleet draw mode: {self.settings.fleet_draw_mode!r}")
+		self.fleet_image = FleetImage(self) if self.settings.fleet_draw_mode == 'composite' else None
 		self._create_fleet()
 
-		# Store sound effects
-		self.bullet_sound = pygame.mixer.Sound('sounds/shoot.wav')
-		self.bullet_sound.set_volume(0.1)
-		self.invader_sound = pygame.mixer.Sound('sounds/invaderkilled.wav')
-		self.invader_sound.set_volume(0.1)
-		self.ship_explode_sound = pygame.mixer.Sound('sounds/explosion2.wav')
-		self.bullet_sound.set_volume(0.2)
+		# Shots fired by the aliens, at random times that follow the seed so games can be replayed
+		self.alien_shots = AlienShots(self)
+		if self.settings.alien_fire_seed is None:
+			self.settings.alien_fire_seed = int(np.random.SeedSequence().entropy)
+		self.alien_fire_rng = np.random.default_rng(self.settings.alien_fire_seed)
+		self.startup.mark('game objects')
+
+		# Sound effects play on their own mixer channels, loaded in the background (silent until loaded)
+		if self.headless:
+			self.sounds = NullSoundManager()
+		else:
+			startup = self.startup
+			self.sounds = SoundManager(self.settings, lambda: startup.mark_background('sounds'))
+
+		# Timed phases (level start, explosion, game over) shown while the game logic is paused
+		self.overlays = deque()
+
+		# Keyboard input is gathered between ticks and applied at the start of the next tick,
+		# so every tick's input can be recorded and played back exactly.
+		self.pending_fire = False
+		self.pending_start = False
+		self.input = InputPipeline(self)  # Gameplay keys waiting for the tick they were pressed in
+		self.ticks = 0          # Number of ticks of game logic run so far
+		self.ship_losses = []   # Ticks on which a ship was lost
+		self.recorder = ReplayRecorder(self) if self.settings.replay_record_path else None
+
+		# Stream each tick to spectators (the server runs in its own thread)
+		if self.settings.telemetry_port is not None:
+			self.telemetry = TelemetryServer(self)
+		else:
+			self.telemetry = NullTelemetry()
 
+		# Time each phase of the main loop (wraps the methods above, so it is created last)
+		if self.settings.profiler_enabled and not self.headless:
+			self.profiler = FrameProfiler(self)
+		else:
+			self.profiler = NullProfiler()
 
 		# Create intro text
 		intro_text = [
 			"Alien Invaders - Enter if you dare!",
 			"Spacebar to start.",
 			"Press 'q' to quit."]
-		self.intro_button = MultiLineMessage(self, intro_text, 600, 175)
+		self.intro_button = None if self.headless else MultiLineMessage(self, intro_text, 600, 175)
+
+		# Compose the lines shown at every level start and game over ahead of time
+		if not self.headless:
+			self.intro_button.atlas.preload(["Ready Player One!", "Game Over!"])
+		self.startup.mark('messages')
 
 		level_text = [
 			"Level 1",
 			"Aliens worth xx Points"]
 
 	def run_game(self):
-		"""Start the main loop for the game."""
+		"""Start the main loop for the game.
+		   The game logic runs in fixed ticks driven by an accumulator of elapsed time,
+		   while the screen is redrawn at most max_fps times a second."""
+
+		tick_seconds = 1.0 / self.settings.ticks_per_second
+		frame_seconds = 1.0 / self.settings.max_fps if self.settings.max_fps else 0.0
+		accumulator = 0.0
+		first_frame = True
+		frame_start = time.perf_counter()
 
 		# Run indefinitely until the user quits or closes
 		while True:
+			# Wait out the rest of the frame (if capped) and find out how long it took.
+			# The first frame is drawn straight away, and frame timing starts from it
+			if not first_frame:
+				self._wait_for_frame(frame_start + frame_seconds)
+			now = time.perf_counter()
+			accumulator += now - frame_start
+			frame_start = now
+
 			# check for keyboard and mouse events
 			self._check_events()
 
-			# If game is actively being played, update the sprites
-			if self.stats.game_active:
-				self.ship.update()
-				self._update_bullets()
-				self._update_aliens()
+			# While a message or explosion is shown, the game logic waits for it to finish
+			if self.overlays:
+				self._update_overlays(accumulator)
+				accumulator = 0.0
+
+			# If game is actively being played, update the sprites once per elapsed tick
+			elif self.stats.game_active:
+				ticks = 0
+				while (accumulator >= tick_seconds and ticks < self.settings.max_ticks_per_frame
+					   and not self.overlays):
+					# The ticks run now cover the time from (now - accumulator) up to now,
+					# so apply the keys pressed up to the end of this tick before running it
+					self.input.apply_until(now - accumulator + tick_seconds)
+					self.step()
+					accumulator -= tick_seconds
+					ticks += 1
+				if ticks == self.settings.max_ticks_per_frame or self.overlays:
+					accumulator = 0.0  # Too far behind to catch up (or paused), so don't try to catch up
+				if self.overlays:
+					self.input.flush()  # Keys pressed after the pause started don't fire
+			else:
+				accumulator = 0.0
 
 			# update the main screen based on sprite activity
 			self._update_screen()
+			self.profiler.end_frame()
+
+			if first_frame:
+				self._report_startup()
+				first_frame = False
+
+	def _wait_for_frame(self, frame_end):
+		"""Wait until frame_end (a time.perf_counter() time), reading events every millisecond meanwhile
+		   so key presses are timestamped close to when they happened."""
+
+		while time.perf_counter() < frame_end - 0.001:
+			pygame.time.wait(1)
+			self._check_events()
+
+	def _report_startup(self):
+		"""Record the first frame being on screen and print the startup times (if asked to)."""
+
+		self.startup.mark('first frame')
+		if self.settings.report_startup:
+			print(self.startup.report())
+
+	def step(self, tick_input=None):
+		"""Advance the game logic (ship, bullets, fleet, collisions, scoring) by one tick.
+		   tick_input (TickInput flags) replaces the keyboard for this tick, e.g. to play back a replay."""
+
+		if tick_input is None:
+			tick_input = self._read_input()
+		else:
+			self._apply_input(tick_input)
+		if self.recorder:
+			self.recorder.record(tick_input)
+		self.ticks += 1
+
+		if tick_input & TickInput.FIRE:
+			self._fire_bullet()
+		self.ship.update(self.tick_dt)
+		self._update_bullets()
+		self._update_aliens()
+		self.telemetry.capture()
+
+	def run_simulation(self, max_frames):
+		"""Play a game without any user interaction until it is over or max_frames have elapsed.
+		   Intended for headless mode. Returns the number of frames simulated."""
+
+		if not self.stats.game_active:
+			self.start_game()
+
+		frames = 0
+		while self.stats.game_active and frames < max_frames:
+			self.step()
+			frames += 1
+		return frames
+
+	def start_game(self):
+		"""Reset the statistics and start a new game on level one."""
+
+		if self.recorder:
+			self.recorder.game_starting()
+		self.pending_fire = False
+		self.pending_start = True
+		self._reset_stats_for_display()
+		self._start_level()
+
+	def snapshot(self):
+		"""Return a GameSnapshot of the complete live state of the game."""
+		return GameSnapshot(self)
+
+	def restore(self, snapshot):
+		"""Put the game back in the state of a GameSnapshot."""
+		snapshot.restore(self)
+
+	def fork(self):
+		"""Return a new headless game in the same state as this one, e.g. to look ahead
+		   without touching this game.  To branch many times, reusing a few games and
+		   restoring snapshots into them is cheaper than forking each time."""
+
+		settings = copy.copy(self.settings)
+		settings.headless_mode = True
+		settings.replay_record_path = None
+		settings.profiler_enabled = False
+		settings.telemetry_port = None
+		branch = AlienInvasion(settings)
+		branch.restore(self.snapshot())
+		return branch
+
+	def jump_to_level(self, level):
+		"""Start a level (with a new fleet) at the speed and point value it has in a normal game,
+		   without playing through the levels before it.  Starts a new game if none is active."""
+
+		if not self.stats.game_active:
+			self.start_game()
+			self._finish_overlays()
+		while self.stats.level < level:
+			self.stats.level += 1
+			self.settings.increase_speed()
+		self.sb.prep_level()
+		self._reset_sprites()
+
+	def _read_input(self):
+		"""Return the keyboard input gathered since the last tick as TickInput flags."""
+
+		tick_input = TickInput.NONE
+		if self.pending_fire:
+			tick_input |= TickInput.FIRE
+		if self.ship.moving_left:
+			tick_input |= TickInput.LEFT
+		if self.ship.moving_right:
+			tick_input |= TickInput.RIGHT
+		if self.pending_start:
+			tick_input |= TickInput.START
+		self.pending_fire = False
+		self.pending_start = False
+		return tick_input
+
+	def _apply_input(self, tick_input):
+		"""Use TickInput flags instead of the keyboard for this tick."""
+
+		if tick_input & TickInput.START and not self.stats.game_active:
+			self.start_game()
+			self.pending_start = False
+		self.ship.moving_left = bool(tick_input & TickInput.LEFT)
+		self.ship.moving_right = bool(tick_input & TickInput.RIGHT)
+
+	def _quit(self):
+		"""Save the replay (if recording) and quit the game."""
+
+		if self.recorder:
+			# Playback skips the overlays, so finish them to record the same outcome
+			self._finish_overlays()
+			self.recorder.save(self.settings.replay_record_path)
+		self.profiler.save()
+		self.telemetry.close()
+		sys.exit()
 
 	def _check_events(self):
 		"""Listen for and then process keyboard and mouse events."""
 
 		for event in pygame.event.get():
 			if event.type == pygame.QUIT:
-				sys.exit()  # user ends game by closing window with mouse click
+				self._quit()  # user ends game by closing window with mouse click
 			elif event.type == pygame.KEYDOWN:
 				self._check_keydown_events(event)
 			elif event.type == pygame.KEYUP:
@@ -102,22 +381,23 @@ class AlienInvasion:
 
 		# pressing q stops the game at any time
 		if event.key == pygame.K_q:
-			sys.exit()  # user ends game by typing q
+			self._quit()  # user ends game by typing q
+		elif event.key == pygame.K_F3:
+			self.profiler.toggle_hud()
 
-		# If game is active, keyboard moves ship and fires bullet
+		# If game is active, keyboard moves ship and fires bullet (at the tick the key was pressed in)
 		# If game is not active, pressing spacebar starts the game
+		# While a message is shown, the spacebar is ignored so it can't fire or restart early
 		if self.stats.game_active:
-			if event.key == pygame.K_SPACE:
-				self._fire_bullet()
-			elif event.key == pygame.K_RIGHT:
-				self.ship.moving_right = True
-			elif event.key == pygame.K_LEFT:
-				self.ship.moving_left = True
-		else:
+			if event.key in self.input.keys:
+				if self.overlays:
+					self.input.apply(event.key, True, fire=False)
+				else:
+					self.input.capture(event.key, True)
+		elif not self.overlays:
 			if event.key == pygame.K_SPACE:
 				pygame.mouse.set_visible(False)  # Hide the mouse cursor.
-				self._reset_stats_for_display()
-				self._start_level()
+				self.start_game()
 
 	def _start_level(self, advance_level=False):
 		"""Reset sprites, and statistics and prepare to play level"""
@@ -137,53 +417,79 @@ class AlienInvasion:
 		level_text = [	f"On Level {self.stats.level}.",
 						f"Aliens worth {self.settings.alien_points} points.",
 						"Ready Player One!"	]
-		self._display_text(level_text, 425, 175, 2)
+		self._show_overlay(self.settings.level_start_duration, level_text, 425, 175)
 
 	def _game_over(self):
 		"""Sad Tuba, Inform the player that the game is over"""
 
 		level_text = [f"Game Over!"]
-		self._display_text(level_text, 235, 75, 1.5, False)
+		self._show_overlay(self.settings.game_over_duration, level_text, 235, 75, self._end_game)
+
+	def _end_game(self):
+		"""Stop the game once the game over message has been shown"""
+
+		self.stats.game_active = False
+		if not self.headless:
+			# Show the mouse cursor.
+			pygame.mouse.set_visible(True)
 
-	def _display_text(self, text, width, height, sleep_time, update_game_elements=True):
-		"""Display message box to inform player"""
+	def _show_overlay(self, duration, text=None, width=0, height=0, on_finish=None):
+		"""Display a message box (if text is given) to inform player for a brief time,
+		   then call on_finish.  The main loop keeps running while it is shown."""
 
-		if update_game_elements:
-			# Show the sprites for the new level
-			self._update_gaming_elements()
-			pygame.display.flip()
+		# No one is watching in headless mode, so skip straight to the end.
+		if self.headless:
+			if on_finish:
+				on_finish()
+			return
+
+		message = MultiLineMessage(self, text, width, height) if text else None
+		self.overlays.append(Overlay(duration, message, on_finish))
+
+	def _finish_overlays(self):
+		"""Skip to the end of every overlay waiting to be shown"""
 
-		# Render text to messagebox and display for brief time
-		level_message = MultiLineMessage(self, text, width, height)
-		level_message.draw_button()
-		pygame.display.flip()
-		sleep(sleep_time)
+		while self.overlays:
+			overlay = self.overlays.popleft()
+			if overlay.on_finish:
+				overlay.on_finish()
+
+	def _update_overlays(self, seconds):
+		"""Count down the overlay being shown and move on to the next one when it finishes"""
+
+		overlay = self.overlays[0]
+		if overlay.update(seconds):
+			self.overlays.popleft()
+			if overlay.on_finish:
+				overlay.on_finish()
 
 	def _check_keyup_events(self, event):
 		"""Responds to the key releases."""
 
-		if event.key == pygame.K_RIGHT:
-			self.ship.moving_right = False
-		elif event.key == pygame.K_LEFT:
-			self.ship.moving_left = False
+		if event.key in self.input.keys:
+			if self.stats.game_active and not self.overlays:
+				self.input.capture(event.key, False)
+			else:
+				self.input.apply(event.key, False)
 
 	def _fire_bullet(self):
 		"""Add a bullet if you are less than the max bullets"""
 
 		if len(self.bullets) < self.settings.bullets_allowed:
-			new_bullet = Bullet(self)
+			new_bullet = self.bullet_pool.acquire()
 			self.bullets.add(new_bullet)
-			self.bullet_sound.play()
+			self.sounds.play('shoot')
 
 	def _update_bullets(self):
 		"""Update bullet positions, get rid of old bullets, and check for aliens shot down"""
 
-		self.bullets.update()  # update locations
-
-		# Get rid of bullets that have moved past the top of the screen.
-		for bullet in self.bullets.copy():
+		# Update locations and get rid of bullets that have moved past the top of the screen
+		# in a single pass, returning them to the pool.
+		for bullet in self.bullets.sprites():
+			bullet.update(self.tick_dt)
 			if bullet.rect.bottom <= 0:
 				self.bullets.remove(bullet)
+				self.bullet_pool.release(bullet)
 		# print(len(self.bullets))
 
 		# Remove bullets that collided with aliens
@@ -196,14 +502,26 @@ class AlienInvasion:
 		# Check for any bullets that have hit aliens.
 		# If so, get rid of the bullet and the alien
 		# Note: if a bullet is wide enough, it can hit multiple aliens
-		collisions = pygame.sprite.groupcollide(self.bullets, self.aliens, True, True)
+		if self.array_fleet:
+			collisions = self.aliens.collide_bullets(self.bullets)
+		elif self.use_alien_grid:
+			collisions = self._grid_bullet_alien_collisions()
+		else:
+			collisions = pygame.sprite.groupcollide(self.bullets, self.aliens, True, True, self.collided)
 
 		if collisions:
 			# If you have very wide bullets, you can hit multiple aliens at a time
 			# len(aliens) is the number of aliens hit with a single bullet
-			self.invader_sound.play()
-			for aliens in collisions.values():
+			self.sounds.play('invader')
+			for bullet, aliens in collisions.items():
 				self.stats.score += self.settings.alien_points * len(aliens)
+				self.bullet_pool.release(bullet)
+				if self.fleet_image:
+					self._remove_from_fleet_image(aliens)
+				if not self.array_fleet:
+					for alien in aliens:
+						self.fleet_bounds.remove(alien)
+					self.alien_pool.release_all(aliens)
 			self.sb.prep_score()
 			self.sb.check_high_score()
 
@@ -211,76 +529,180 @@ class AlienInvasion:
 		if not self.aliens:
 			self._start_level(advance_level=True)
 
+	def _remove_from_fleet_image(self, aliens):
+		"""Wipe the aliens shot down (sprites, or indices into the array fleet) from the fleet image"""
+
+		if self.array_fleet:
+			for column, row in zip(self.aliens.columns[aliens].tolist(), self.aliens.rows[aliens].tolist()):
+				self.fleet_image.remove(column, row)
+		else:
+			for alien in aliens:
+				self.fleet_image.remove(alien.column, alien.row)
+
+	def _grid_bullet_alien_collisions(self):
+		"""Same as pygame.sprite.groupcollide(self.bullets, self.aliens, True, True),
+		   but each bullet is only tested against the aliens near it in the alien grid."""
+
+		collisions = {}
+		for bullet in self.bullets.sprites():
+			aliens_hit = self._grid_collide(bullet)
+			if aliens_hit:
+				for alien in aliens_hit:
+					alien.kill()
+					self.alien_grid.remove(alien)
+				bullet.kill()
+				collisions[bullet] = aliens_hit
+		return collisions
+
+	def _grid_collide(self, sprite):
+		"""Return the list of aliens that collide with the sprite, found using the alien grid"""
+
+		aliens_hit = [alien for alien in self.alien_grid.query(sprite.rect)
+					  if sprite.rect.colliderect(alien.rect)
+					  and (not self.pixel_perfect or pygame.sprite.collide_mask(sprite, alien))]
+
+		# Check the grid against the brute force approach
+		if self.settings.collision_broadphase == 'compare':
+			expected = pygame.sprite.spritecollide(sprite, self.aliens, False, self.collided)
+			if set(aliens_hit) != set(expected):
+				raise RuntimeError(f"Grid broadphase found {len(aliens_hit)} aliens colliding, "
+								   f"brute force found {len(expected)}.")
+		return aliens_hit
+
+	@staticmethod
+	def _collide_pixels(sprite, alien):
+		"""Return true if the sprite and the alien overlap: a cheap rect test first,
+		   then their masks for the few pairs whose rects overlap"""
+
+		return (sprite.rect.colliderect(alien.rect)
+				and pygame.sprite.collide_mask(sprite, alien) is not None)
+
 	def _update_aliens(self):
 		"""Update alien positions"""
 
-		self.aliens.update()  # move horizontally
+		self.aliens.update(self.tick_dt)  # move horizontally
+		if self.use_alien_grid:
+			self.alien_grid.shift(self.settings.alien_speed * self.settings.fleet_direction * self.tick_dt, 0)
 
 		if self._check_fleet_edges(): 		     # check to see if you hit an edge
 			self.settings.fleet_direction *= -1  # change direction of horizontal movement
-			for alien in self.aliens:            # move the alien fleet down
-				alien.march_down()
+			self._fleet_march_down()             # move the alien fleet down
 
 		# Look for ship/alien collisions
-		if pygame.sprite.spritecollideany(self.ship, self.aliens):
+		if self._check_ship_alien_collision():
+			self._ship_lost()
+			return
+
+		# Look for alien shots hitting the ship
+		if self._update_alien_fire():
 			self._ship_lost()
 			return
 
 		# Look for aliens hitting the bottom of the screen
 		self._check_aliens_bottom()
 
+	def _update_alien_fire(self):
+		"""Let the aliens fire, move their shots, and return true if a shot hit the ship"""
+
+		# On average rate shots a second, so a Poisson number of shots this tick
+		rate = self.settings.alien_fire_rate(self.stats.level)
+		if rate and self.aliens:
+			number = self.alien_fire_rng.poisson(rate / self.settings.ticks_per_second)
+			if number:
+				self._fire_alien_shots(number)
+
+		self.alien_shots.update(self.tick_dt)
+		return self.alien_shots.hit(self.ship.rect, self.ship.mask if self.pixel_perfect else None)
+
+	def _fire_alien_shots(self, number):
+		"""Fire number shots, each from the lowest alien of a random column"""
+
+		if self.array_fleet:
+			x, y = self.aliens.gunners()
+		else:
+			x, y = self.fleet_bounds.gunners()
+		rng = self.alien_fire_rng
+		gunners = rng.integers(len(x), size=number)
+		drift = rng.uniform(-self.settings.alien_shot_drift, self.settings.alien_shot_drift, number)
+		self.alien_shots.fire(x[gunners], y[gunners], drift, self.settings.alien_shot_speed)
+
 	def _ship_lost(self):
 		"""Respond to the ship being lost by it being hit or the aliens get to the bottom"""
 
+		self.ship_losses.append(self.ticks)
 		if self.stats.ships_left > 0:
-			self._explode_and_pause(1.0)
+			self._explode_and_pause(self.settings.explosion_duration, self._replace_ship)
+		else:
+			# The spacebar is ignored until the game over message is gone,
+			# so a lingering spacebar hit can't start a new game
+			self._explode_and_pause(self.settings.final_explosion_duration, self._game_over)
+
+	def _replace_ship(self):
+		"""Use up one of the remaining ships after an explosion"""
+
+		# Decrement ships_left and update the scoreboard.
+		self.stats.ships_left -= 1
+		self.sb.prep_ships()
+
+		# Restart the same level with a new fleet
+		self._start_level()
 
-			# Decrement ships_left and update the scoreboard.
-			self.stats.ships_left -= 1
-			self.sb.prep_ships()
+	def _explode_and_pause(self, pause_in_seconds, on_finish):
+		"""Explode the ship and pause to let the gravity of the moment sink in :)
+		   on_finish is called once the pause is over."""
 
-			# Restart the same level with a new fleet
-			self._start_level()
+		# put an exploded ship on the old ship (drawn on top of the game board until the ship is reset)
+		self.sounds.play('explosion')
+		self.ship.exploded = True
+		self._show_overlay(pause_in_seconds, on_finish=on_finish)
+
+	def _fleet_march_down(self):
+		"""Move every alien in the fleet down"""
+
+		if self.array_fleet:
+			self.aliens.march_down()
 		else:
-			self._explode_and_pause(0.75)
-			self._game_over()
-			self.stats.game_active = False
-			# remove all the events from the last game
-			# if you don't, a lingering spacebar hit may start a new game
-			pygame.event.clear()
+			for alien in self.aliens:
+				alien.march_down()
+			if self.use_alien_grid:
+				self.alien_grid.shift(0, self.settings.fleet_drop_speed)
 
-			# Show the mouse cursor.
-			pygame.mouse.set_visible(True)
+	def _check_ship_alien_collision(self):
+		"""Return true if an alien has collided with the ship"""
 
-	def _explode_and_pause(self, pause_in_seconds):
-		"""Explode the ship and pause to let the gravity of the moment sink in :) """
-		# Update screen so you can see last game board
-		# put an exploded ship on the old ship
-		self.ship_explode_sound.play()
-		self._update_screen()
-		self.ship.explode_ship()
-		pygame.display.flip()
-		sleep(pause_in_seconds)
+		if self.array_fleet:
+			return self.aliens.collides_with(self.ship.rect, self.ship.mask)
+		if self.use_alien_grid:
+			return bool(self._grid_collide(self.ship))
+		return pygame.sprite.spritecollideany(self.ship, self.aliens, self.collided)
+
+	def _fleet_rect(self):
+		"""Return one rect covering the whole alien fleet (None if there are no aliens)"""
+
+		if self.array_fleet:
+			return self.aliens.bounding_rect()
+		return self.fleet_bounds.rect()
 
 	def _check_fleet_edges(self):
 		"""Return true if an alien touches an left/right edge"""
 
-		edge_touch = False
-		for alien in self.aliens:
-			if alien.check_edges():
-				edge_touch = True
-				break
-		return edge_touch
+		if self.array_fleet:
+			return self.aliens.check_edges()
+
+		# The fleet moves as one, so only its outermost aliens need checking
+		return self.fleet_bounds.at_edge(self.screen_rect)
 
 	def _check_aliens_bottom(self):
 		"""Check if any aliens have reached the bottom of the screen."""
 
-		screen_rect = self.screen.get_rect()
-		for alien in self.aliens:
-			if alien.rect.bottom >= screen_rect.bottom:
-				#  print(f"The aliens got to the bottom!")
-				self._ship_lost()
-				break
+		if self.array_fleet:
+			reached_bottom = self.aliens.reached_bottom()
+		else:
+			reached_bottom = self.fleet_bounds.at_bottom(self.screen_rect)
+
+		if reached_bottom:
+			#  print(f"The aliens got to the bottom!")
+			self._ship_lost()
 
 	def _update_screen(self):
 		"""Redraw the screen refreshing all content.
@@ -288,29 +710,58 @@ class AlienInvasion:
 		   Then populate all the gaming elements (sprites, scores, ect).
 		   Lastly, display message box to allow the player to play/restart
 		   Note that the rendering is done to the screen surface that is only made
-		   visible to the user when the .flip routine is called to make movement smoother."""
+		   visible to the user when the renderer presents it to make movement smoother."""
 
 		self._update_gaming_elements()
 
-		# If the game is inactive, draw the intro message box.
-		if not self.stats.game_active:
-				self.intro_button.draw_button()
-				# in case the ship is exploded, put it on the top of the alien
-				self.ship.blitme()
+		# Draw the message being shown, or if the game is inactive, draw the intro message box.
+		if self.overlays:
+			self.renderer.add(self.overlays[0].draw())
+		elif not self.stats.game_active:
+				self.renderer.add(self.intro_button.draw_button())
+
+		# in case the ship is exploded, put it on the top of the alien
+		if self.ship.exploded:
+			self.renderer.add(self.ship.blitme())
+
+		# Frame timings, if profiling
+		self.renderer.add(self.profiler.draw())
 
 		# Make the most recently drawn screen visible
-		pygame.display.flip()
+		self.renderer.present()
 
 	def _update_gaming_elements(self):
-		"""Fill surface with background color to reset screen
-		   then draw all sprites, scores, levels, and remaining ships."""
-		self.screen.fill(self.settings.bg_color)
-		self.ship.blitme()
+		"""Wipe the screen with the background color (only the parts that changed
+		   when drawing dirty rects), then draw all sprites, scores, levels, and remaining ships."""
+		self.renderer.clear()
+		self.renderer.add(self.ship.blitme())
 		for bullet in self.bullets.sprites():
-			bullet.draw_bullet()
-		self.aliens.draw(self.screen)
+			self.renderer.add(bullet.draw_bullet())
+
+		if self.fleet_image:
+			self._draw_fleet_image()
+		else:
+			self.aliens.draw(self.screen)
+		self.renderer.add(self._fleet_rect())
+		for rect in self.alien_shots.draw(self.screen):
+			self.renderer.add(rect)
+
 		# Draw the score & ships remaining
-		self.sb.show_score()
+		for rect in self.sb.show_score():
+			self.renderer.add(rect)
+
+	def _draw_fleet_image(self):
+		"""Draw the pre-composited fleet, placed using the position of one of its living aliens"""
+
+		if not self.aliens:
+			return
+		if self.array_fleet:
+			index = self.aliens.edges[0]
+			self.fleet_image.draw(self.screen, int(self.aliens.rect_x[index]), int(self.aliens.rect_y[index]),
+								  int(self.aliens.columns[index]), int(self.aliens.rows[index]))
+		else:
+			alien = self.fleet_bounds.left_alien
+			self.fleet_image.draw(self.screen, alien.rect.x, alien.rect.y, alien.column, alien.row)
 
 	def _create_fleet(self):
 		"""Create the fleet of aliens."""
@@ -318,9 +769,13 @@ class AlienInvasion:
 		# Number of aliens per row will leave at least 1 alien width of space on left & right
 		# Initial number of rows of aliens will fill the top two thirds of the screen
 		# Make an alien
-		alien = Alien(self)
-		alien_width = alien.rect.width
-		alien_height = alien.rect.height
+		if self.array_fleet:
+			alien_width, alien_height = self.aliens.width, self.aliens.height
+		else:
+			alien = self.alien_pool.acquire()
+			alien_width = alien.rect.width
+			alien_height = alien.rect.height
+			self.alien_pool.release(alien)
 
 		# Determine the number of aliens per row
 		available_space_x = self.settings.screen_width - 2 * alien_width
@@ -330,6 +785,15 @@ class AlienInvasion:
 		ship_height = self.ship.rect.height
 		available_space_y = self.settings.screen_height - (3 * alien_height) - ship_height
 		number_rows = available_space_y // (2 * alien_height)
+		self.fleet_formation = (number_columns, number_rows)
+
+		if self.fleet_image:
+			self.fleet_image.build(number_columns, number_rows)
+
+		# The array fleet creates all the aliens in one go
+		if self.array_fleet:
+			self.aliens.build(number_columns, number_rows)
+			return
 
 		# Create the first row of aliens
 		for row_number in range(number_rows):
@@ -339,7 +803,7 @@ class AlienInvasion:
 	def _create_alien(self, alien_number, row_number):
 		"""Create an alien and place it in the row, column fleet"""
 
-		alien = Alien(self)
+		alien = self.alien_pool.acquire()
 		(alien_width, alien_height) = alien.rect.size
 
 		# Include a buffer on the side and one blank space in between each alien
@@ -348,24 +812,34 @@ class AlienInvasion:
 
 		# Store the horizontal location as a float for smoother motion.
 		alien.x = alien.rect.x
+		alien.column, alien.row = alien_number, row_number
 
 		self.aliens.add(alien)
+		self.fleet_bounds.add(alien)
+		if self.use_alien_grid:
+			self.alien_grid.insert(alien, alien.rect)
 
 	def _check_intro_button(self, mouse_pos):
 		"""Start a new game when the player clicks the intro text."""
 
 		button_clicked = self.intro_button.rect.collidepoint(mouse_pos)
 		if button_clicked and not self.stats.game_active:
-			self._reset_stats_for_display()
-			self._start_level()
+			self.start_game()
 			pygame.mouse.set_visible(False)  # Hide the mouse cursor.
 
 	def _reset_sprites(self):
 		"""Clear old sprites, create a new fleet, and center ship."""
 
-		self.aliens.empty()
-		self.bullets.empty()
+		if self.array_fleet:
+			self.aliens.empty()
+		else:
+			self.alien_pool.release_group(self.aliens)
+		self.alien_grid.clear()
+		self.fleet_bounds.clear()
+		self.bullet_pool.release_group(self.bullets)
+		self.alien_shots.empty()
 		self._create_fleet()
+		self.telemetry.invalidate()
 		self.ship.center_ship()
 		self.ship.exploded = False
 
@@ -0,0 +1,119 @@
+import threading
+import pygame
+from glyph_atlas import GlyphAtlas
+
+
+class Assets:
+    """Static class to load each image, sound, and font once and share it across the whole game.
+       Images are converted to the display's pixel format (when a display exists) so they blit fast.
+       Collision masks of the images are also made once and shared by every sprite using them."""
+
+    images = {}      # path -> Surface
+    converted = set()  # paths of the images already converted to the display format
+    masks = {}       # image path, or (width, height) of a solid rect -> Mask
+    sounds = {}      # path -> Sound
+    fonts = {}       # (name, size) -> Font
+    atlases = {}     # (name, size, text color, background color) -> GlyphAtlas
+    sound_loader = None  # Thread loading sounds in the background
+
+    @classmethod
+    def image(cls, path):
+        """Return the image stored at path, loading it from disk the first time it is needed."""
+
+        image = cls.images.get(path)
+        if image is None:
+            image = pygame.image.load(path)
+            cls.images[path] = image
+
+        # Converting requires a display, so images loaded before (or without) one are converted later
+        if path not in cls.converted and pygame.display.get_surface() is not None:
+            if image.get_flags() & pygame.SRCALPHA:
+                image = image.convert_alpha()
+            else:
+                image = image.convert()
+            cls.images[path] = image
+            cls.converted.add(path)
+        return image
+
+    @classmethod
+    def mask(cls, path):
+        """Return the collision mask of the image stored at path, making it the first time it is needed.
+           Images have no transparency, so their background is the color of their top left pixel."""
+
+        mask = cls.masks.get(path)
+        if mask is None:
+            image = cls.image(path).copy()
+            if not image.get_flags() & pygame.SRCALPHA:
+                image.set_colorkey(image.get_at((0, 0)))
+            mask = pygame.mask.from_surface(image)
+            cls.masks[path] = mask
+        return mask
+
+    @classmethod
+    def solid_mask(cls, size):
+        """Return a fully set collision mask of the given (width, height), e.g. for a bullet."""
+
+        size = tuple(size)
+        mask = cls.masks.get(size)
+        if mask is None:
+            mask = pygame.mask.Mask(size, fill=True)
+            cls.masks[size] = mask
+        return mask
+
+    @classmethod
+    def sound(cls, path):
+        """Return the sound stored at path, loading it from disk the first time it is needed.
+           Requires the pygame mixer to be initialized."""
+
+        sound = cls.sounds.get(path)
+        if sound is None:
+            sound = pygame.mixer.Sound(path)
+            cls.sounds[path] = sound
+        return sound
+
+    @classmethod
+    def load_sounds_in_background(cls, paths, on_loaded=None):
+        """Initialize the mixer and load the sounds in a background thread so startup doesn't wait for them.
+           on_loaded is called (from the thread) once every sound is loaded.
+           If there is no audio device, nothing is loaded.  Returns the thread."""
+
+        def load():
+            try:
+                pygame.mixer.init()
+            except pygame.error:
+                return  # No audio device, so the game stays silent
+            for path in paths:
+                cls.sound(path)
+            if on_loaded:
+                on_loaded()
+
+        cls.sound_loader = threading.Thread(target=load, name='sound loader', daemon=True)
+        cls.sound_loader.start()
+        return cls.sound_loader
+
+    @classmethod
+    def font(cls, name, size):
+        """Return the font with the given name and size, creating it the first time it is needed.
+           name None is pygame's default font, loaded directly instead of searching the system fonts (slow)."""
+
+        key = (name, size)
+        font = cls.fonts.get(key)
+        if font is None:
+            if name is None:
+                font = pygame.font.Font(None, size)
+            else:
+                font = pygame.font.SysFont(name, size)
+            cls.fonts[key] = font
+        return font
+
+    @classmethod
+    def glyph_atlas(cls, name, size, text_color, bg_color, characters=""):
+        """Return the glyph atlas for a font and color combination, creating it the first time it is needed.
+           characters are pre-rendered when the atlas is created."""
+
+        key = (name, size, tuple(text_color), tuple(bg_color))
+        atlas = cls.atlases.get(key)
+        if atlas is None:
+            atlas = GlyphAtlas(cls.font(name, size), text_color, bg_color, characters)
+            cls.atlases[key] = atlas
+        return atlas
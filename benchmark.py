@@ -0,0 +1,235 @@
+import os
+import sys
+import json
+import time
+import random
+import platform
+import argparse
+import statistics
+
+# Keep the output clean when pygame is imported
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import numpy
+import pygame
+from settings import Settings
+from alien_invasion import AlienInvasion
+from scoreboard import Scoreboard
+from tick_input import TickInput
+from sweep import hunter_policy
+
+
+PHASES = ('ship.update', '_update_bullets', '_update_aliens', '_update_gaming_elements')
+SCREEN_SIZES = ((800, 600), (1200, 800), (1920, 1080), (3840, 2160), (7680, 4320))
+FLEET_SIZES = (50, 100, 500, 1_000, 5_000, 10_000)
+LEVELS = (1, 10, 30)
+
+
+def make_game(**overrides):
+    """Return a headless game, started and ready to step, with the settings overrides applied.
+       The headless scoreboard is swapped for a real one so drawing costs the same as in the game."""
+
+    settings = Settings()
+    settings.headless_mode = True
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+    pygame.font.init()
+    ai_game = AlienInvasion(settings)
+    ai_game.sb = Scoreboard(ai_game)
+    ai_game.start_game()
+    return ai_game
+
+
+def summarize(samples):
+    """Return the mean, median, 99th percentile, and max of a list of times (in seconds) in microseconds."""
+
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return {'mean_us': round(statistics.mean(samples) * 1e6, 2),
+            'median_us': round(statistics.median(samples) * 1e6, 2),
+            'p99_us': round(p99 * 1e6, 2),
+            'max_us': round(samples[-1] * 1e6, 2),
+            'samples': len(samples)}
+
+
+def bench_phases(ticks):
+    """Time each phase of a tick (and drawing a frame) while a bot plays level 1."""
+
+    ai_game = make_game()
+    timer = time.perf_counter
+    samples = {phase: [] for phase in PHASES}
+
+    for _ in range(ticks):
+        # Same as AlienInvasion.step, with a timer around each phase
+        tick_input = hunter_policy(ai_game)
+        ai_game._apply_input(tick_input)
+        ai_game.ticks += 1
+        if tick_input & TickInput.FIRE:
+            ai_game._fire_bullet()
+
+        start = timer()
+        ai_game.ship.update(ai_game.tick_dt)
+        ship_done = timer()
+        ai_game._update_bullets()
+        bullets_done = timer()
+        ai_game._update_aliens()
+        aliens_done = timer()
+        ai_game._update_gaming_elements()
+        draw_done = timer()
+        ai_game.renderer.present()
+
+        samples['ship.update'].append(ship_done - start)
+        samples['_update_bullets'].append(bullets_done - ship_done)
+        samples['_update_aliens'].append(aliens_done - bullets_done)
+        samples['_update_gaming_elements'].append(draw_done - aliens_done)
+
+        if not ai_game.stats.game_active:
+            ai_game.start_game()
+
+    return {phase: summarize(times) for phase, times in samples.items()}
+
+
+def bench_create_fleet(screen_sizes, repeats):
+    """Time building the fleet for each screen size (best of repeats, with the pool already warm)."""
+
+    results = []
+    for width, height in screen_sizes:
+        ai_game = make_game(screen_width=width, screen_height=height)
+        best = float('inf')
+        for _ in range(repeats):
+            ai_game.alien_pool.release_group(ai_game.aliens)
+            ai_game.fleet_bounds.clear()
+            ai_game.alien_grid.clear()
+            start = time.perf_counter()
+            ai_game._create_fleet()
+            best = min(best, time.perf_counter() - start)
+        results.append({'screen_size': [width, height],
+                        'aliens': len(ai_game.aliens),
+                        'best_ms': round(best * 1e3, 3)})
+    return results
+
+
+def bench_groupcollide(fleet_sizes, repeats):
+    """Time pygame.sprite.groupcollide between a full load of bullets and fleets of many sizes.
+       The aliens are scattered at random (but repeatable) positions over the screen."""
+
+    ai_game = make_game()
+    width, height = ai_game.settings.screen_width, ai_game.settings.screen_height
+    rng = random.Random(0)
+
+    bullets = pygame.sprite.Group()
+    for _ in range(ai_game.settings.bullets_allowed):
+        bullet = ai_game.bullet_pool.acquire()
+        bullet.rect.x = rng.randrange(width)
+        bullet.rect.y = rng.randrange(height)
+        bullets.add(bullet)
+
+    results = []
+    for size in fleet_sizes:
+        aliens = pygame.sprite.Group()
+        for _ in range(size):
+            alien = ai_game.alien_pool.acquire()
+            alien.rect.x = rng.randrange(width - alien.rect.width)
+            alien.rect.y = rng.randrange(height - alien.rect.height)
+            aliens.add(alien)
+
+        # Nothing is killed, so every repeat does the same work
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            pygame.sprite.groupcollide(bullets, aliens, False, False)
+            times.append(time.perf_counter() - start)
+        results.append(dict(summarize(times), aliens=size, bullets=len(bullets)))
+        ai_game.alien_pool.release_group(aliens)
+    return results
+
+
+def bench_levels(levels, frames):
+    """Measure how many frames per second the game logic and drawing can run at on each level.
+       Each frame runs the ticks covered by one frame at max_fps, then draws the screen."""
+
+    results = []
+    for level in levels:
+        ai_game = make_game()
+        ai_game.jump_to_level(level)
+        ticks_per_frame = max(1, round(ai_game.settings.ticks_per_second / ai_game.settings.max_fps))
+
+        start = time.perf_counter()
+        for _ in range(frames):
+            for _ in range(ticks_per_frame):
+                ai_game.step(hunter_policy(ai_game))
+            ai_game._update_gaming_elements()
+            ai_game.renderer.present()
+
+            # Keep playing the same level if the bot loses the game
+            if not ai_game.stats.game_active:
+                ai_game.start_game()
+                ai_game.jump_to_level(level)
+        elapsed = time.perf_counter() - start
+
+        results.append({'level': level,
+                        'frames': frames,
+                        'ticks_per_frame': ticks_per_frame,
+                        'fps': round(frames / elapsed, 1)})
+    return results
+
+
+def environment():
+    """Return a description of the machine and versions the benchmark ran with."""
+
+    return {'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'numpy': numpy.__version__,
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine()}
+
+
+def run_benchmarks(ticks=5_000, repeats=20, frames=1_000):
+    """Run every benchmark and return the results as a dictionary."""
+
+    return {'environment': environment(),
+            'phases': bench_phases(ticks),
+            'create_fleet': bench_create_fleet(SCREEN_SIZES, repeats),
+            'groupcollide': bench_groupcollide(FLEET_SIZES, repeats),
+            'levels': bench_levels(LEVELS, frames)}
+
+
+def print_report(results):
+    """Print a short human-readable summary of the results."""
+
+    print("Phase timings (microseconds per tick):")
+    for phase, stats in results['phases'].items():
+        print(f"  {phase:<26} mean {stats['mean_us']:>9.2f}  p99 {stats['p99_us']:>9.2f}")
+    print("Fleet creation:")
+    for result in results['create_fleet']:
+        size = "{}x{}".format(*result['screen_size'])
+        print(f"  {size:<10} {result['aliens']:>6} aliens  {result['best_ms']:>9.3f} ms")
+    print("groupcollide:")
+    for result in results['groupcollide']:
+        print(f"  {result['aliens']:>6} aliens  mean {result['mean_us']:>10.2f} us")
+    print("End to end:")
+    for result in results['levels']:
+        print(f"  level {result['level']:>3}  {result['fps']:>9.1f} fps")
+
+
+def main(argv):
+    """Run the benchmarks from the command line and save the results as JSON."""
+
+    parser = argparse.ArgumentParser(description="Benchmark the game headless and save the results as JSON.")
+    parser.add_argument('--ticks', type=int, default=5_000, help="Ticks to time the update phases over")
+    parser.add_argument('--repeats', type=int, default=20, help="Repeats of the fleet and collision timings")
+    parser.add_argument('--frames', type=int, default=1_000, help="Frames to play on each level")
+    parser.add_argument('--out', default='benchmark_results.json', help="JSON file to write the results to")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.ticks, args.repeats, args.frames)
+    with open(args.out, 'w') as results_file:
+        json.dump(results, results_file, indent=2)
+    print_report(results)
+    print(f"Results saved to {args.out}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
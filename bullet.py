@@ -1,11 +1,15 @@
+import itertools
 import pygame
 
 from pygame.sprite import Sprite
+from assets import Assets
 
 
 class Bullet(Sprite):
     """A class to manage bullets fired from the ship"""
 
+    serials = itertools.count(1)  # Bullets are recycled, so each shot gets a new serial number to tell it apart
+
     def __init__(self, ai_game):
         """Create a bullet object at the ship's current position."""
 
@@ -14,24 +18,34 @@ class Bullet(Sprite):
         # Shortcut variables to main gaming object and settings
         self.screen = ai_game.screen
         self.settings = ai_game.settings
+        self.ship = ai_game.ship
         self.color = self.settings.bullet_color
 
         # Create a bullet rect at (0,0) and then set position based on ship location.
         self.rect = pygame.Rect(0, 0, self.settings.bullet_width,
                                 self.settings.bullet_height)
-        self.rect.midtop = ai_game.ship.rect.midtop
+        # Only pixel perfect collisions need the mask
+        self.mask = Assets.solid_mask(self.rect.size) if self.settings.pixel_perfect_collisions else None
+        self.reset()
+
+    def reset(self):
+        """Place the bullet at the ship's current position, ready to be fired (again)."""
+
+        self.rect.midtop = self.ship.rect.midtop
+        self.serial = next(Bullet.serials)
 
         # Store the bullet's position as a float to allow for smooth movement.
         self.y = float(self.rect.y)
 
-    def update(self):
-        """Move the bullet up the screen."""
+    def update(self, dt=1.0):
+        """Move the bullet up the screen.
+           dt is the elapsed time in frames at the reference frame rate."""
 
         # Update the position of the bullet.
-        self.y -= self.settings.bullet_speed
+        self.y -= self.settings.bullet_speed * dt
         # Update the rect position of bullet's image.
         self.rect.y = self.y
 
     def draw_bullet(self):
-        """Draw the bullet to the screen."""
-        pygame.draw.rect(self.screen, self.color, self.rect)
+        """Draw the bullet to the screen and return the area drawn."""
+        return pygame.draw.rect(self.screen, self.color, self.rect)
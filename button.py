@@ -1,5 +1,6 @@
-import pygame.font
+import pygame
 from color_dictionary import ColorDictionary as cd
+from assets import Assets
 
 
 class Button:
@@ -17,7 +18,8 @@ class Button:
         self.width, self.height = 200, 50
         self.button_color = cd.color['orange']
         self.text_color = cd.color['white']
-        self.font = pygame.font.SysFont(None, 48)
+        self.font = Assets.font(None, 48)
+        self.atlas = Assets.glyph_atlas(None, 48, self.text_color, self.button_color)
 
         # Build the button's rect object and center it.
         self.rect = pygame.Rect(0, 0, self.width, self.height)
@@ -29,7 +31,7 @@ class Button:
     def _prep_msg(self, msg):
         """Turn msg into a rendered image and center text on the button."""
 
-        self.msg_image = self.font.render(msg, True, self.text_color, self.button_color)
+        self.msg_image = self.atlas.render_line(msg)
         self.msg_image_rect = self.msg_image.get_rect()
         self.msg_image_rect.center = self.rect.center
 
@@ -62,7 +64,8 @@ class MultiLineMessage:
         self.width, self.height = width, height
         self.button_color = cd.color['orange']
         self.text_color = cd.color['white']
-        self.font = pygame.font.SysFont(None, self.font_size)
+        self.font = Assets.font(None, self.font_size)
+        self.atlas = Assets.glyph_atlas(None, self.font_size, self.text_color, self.button_color)
 
         # Build the button's rect object and center it.
         self.rect = pygame.Rect(0, 0, self.width, self.height)
@@ -76,7 +79,7 @@ class MultiLineMessage:
            Save list and save the rect information to self."""
 
         for i, message in enumerate(messages):
-            message_image = self.font.render(message, True, self.text_color, self.button_color)
+            message_image = self.atlas.render_line(message)
             message_rec = message_image.get_rect()
             #message_rec.x = self.rect.left + (self.line_spacing*2)
             message_rec.centerx = self.rect.centerx
@@ -85,9 +88,11 @@ class MultiLineMessage:
             self.message_recs.append(message_rec)
 
     def draw_button(self):
-        """Draw solid rect and place message text above to display multi-line message"""
+        """Draw solid rect and place message text above to display multi-line message.
+           Returns the area drawn."""
 
         self.screen.fill(self.button_color, self.rect)
         for message, rec in zip(self.message_images, self.message_recs):
             self.screen.blit(message, rec)
+        return self.rect
 
@@ -0,0 +1,350 @@
+import numpy as np
+import pygame
+from assets import Assets
+
+
+def round_like_rect(values):
+    """Round floats to ints the same way pygame does when a float is assigned to a Rect.
+       pygame rounds halves away from zero, while numpy rounds halves to even."""
+
+    rounded = np.round(values)
+    halves = np.abs(values - np.trunc(values)) == 0.5
+    rounded[halves] = np.trunc(values[halves]) + np.sign(values[halves])
+    return rounded.astype(np.int64)
+
+
+class ArrayFleet:
+    """A class to represent the whole alien fleet as NumPy arrays (struct-of-arrays)
+       instead of one Alien sprite per alien.
+       Marching, edge checks, bottom checks and drops are each a single vectorized operation.
+       Mimics the parts of the pygame Group interface used by AlienInvasion."""
+
+    def __init__(self, ai_game):
+        """Initialize the fleet arrays and load the shared alien image."""
+
+        # Shortcut variables to main gaming object
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+        self.screen_rect = ai_game.screen.get_rect()
+
+        # Every alien shares the same image and size.
+        self.image = Assets.image('images/alien.bmp')
+        self.width, self.height = self.image.get_size()
+
+        # Aliens that overlap by rect are only hit if their pixels overlap too
+        self.pixel_perfect = self.settings.pixel_perfect_collisions
+        self.mask = Assets.mask('images/alien.bmp') if self.pixel_perfect else None
+
+        self.empty()
+
+    def empty(self):
+        """Remove all aliens from the fleet."""
+
+        self.x = np.zeros(0)                        # Exact horizontal positions as floats
+        self.rect_x = np.zeros(0, dtype=np.int64)   # Rect positions (what Alien.rect.x would be)
+        self.rect_y = np.zeros(0, dtype=np.int64)
+        self.alive = np.zeros(0, dtype=bool)
+        self.columns = np.zeros(0, dtype=np.int64)  # Position of each alien within the formation
+        self.rows = np.zeros(0, dtype=np.int64)
+        self.count = 0                              # Number of aliens still alive
+        self.edges = None                           # Indices of the outermost living aliens
+
+    def build(self, number_columns, number_rows):
+        """Fill the fleet with a grid of aliens, laid out the same way as AlienInvasion._create_alien."""
+
+        self.columns = np.tile(np.arange(number_columns), number_rows)
+        self.rows = np.repeat(np.arange(number_rows), number_columns)
+
+        # Include a buffer on the side and one blank space in between each alien
+        self.rect_x = self.width + 2 * self.width * self.columns
+        self.rect_y = self.height + 2 * self.height * self.rows
+        self.x = self.rect_x.astype(float)
+        self.alive = np.ones(self.rect_x.size, dtype=bool)
+        self.count = int(self.rect_x.size)
+        self._find_edges()
+
+    def _find_edges(self):
+        """Find the leftmost, rightmost, top and bottom living aliens.
+           The fleet moves rigidly, so these stay the outermost aliens until one of them is killed."""
+
+        if not self.count:
+            self.edges = None
+            return
+        living = np.flatnonzero(self.alive)
+        self.edges = (living[np.argmin(self.rect_x[living])], living[np.argmax(self.rect_x[living])],
+                      living[np.argmin(self.rect_y[living])], living[np.argmax(self.rect_y[living])])
+
+    def __len__(self):
+        """Return the number of aliens still alive."""
+        return self.count
+
+    def update(self, dt=1.0):
+        """Move the entire fleet horizontally based on the movement direction.
+           dt is the elapsed time in frames at the reference frame rate."""
+
+        self.x += self.settings.alien_speed * self.settings.fleet_direction * dt
+        self.rect_x = round_like_rect(self.x)
+
+    def check_edges(self):
+        """Returns true if any living alien is at the left/right edge of the screen"""
+
+        if self.edges is None:
+            return False
+        left, right = self.edges[0], self.edges[1]
+        return bool(self.rect_x[left] <= 0 or self.rect_x[right] + self.width >= self.screen_rect.right)
+
+    def march_down(self):
+        """March the whole fleet downwards"""
+        self.rect_y += self.settings.fleet_drop_speed
+
+    def reached_bottom(self):
+        """Returns true if any living alien has reached the bottom of the screen"""
+
+        if self.edges is None:
+            return False
+        return bool(self.rect_y[self.edges[3]] + self.height >= self.screen_rect.bottom)
+
+    def gunners(self):
+        """Return the x of the center and the y of the bottom of the lowest living alien in each column,
+           from the leftmost column to the rightmost (the aliens that can fire)."""
+
+        living = np.flatnonzero(self.alive)
+        # Aliens are stored row by row, so the last living alien of each column is its lowest
+        _, last = np.unique(self.columns[living][::-1], return_index=True)
+        lowest = living[::-1][last]
+        return self.rect_x[lowest] + self.width // 2, self.rect_y[lowest] + self.height
+
+    def _overlaps(self, rect):
+        """Return a mask of the living aliens overlapping rect (same test as Rect.colliderect)."""
+
+        return (self.alive
+                & (self.rect_x < rect.right) & (self.rect_x + self.width > rect.left)
+                & (self.rect_y < rect.bottom) & (self.rect_y + self.height > rect.top))
+
+    def _pixels_overlap(self, indices, rect, mask):
+        """Return the aliens (indices) whose pixels overlap mask placed at rect."""
+
+        x, y = rect.x, rect.y
+        overlapping = [self.mask.overlap(mask, (x - alien_x, y - alien_y)) is not None
+                       for alien_x, alien_y in zip(self.rect_x[indices].tolist(), self.rect_y[indices].tolist())]
+        return indices[np.array(overlapping, dtype=bool)]
+
+    def collides_with(self, rect, mask=None):
+        """Returns true if any living alien overlaps rect (and mask at rect, if pixel perfect)"""
+
+        if not self.pixel_perfect:
+            return bool(np.any(self._overlaps(rect)))
+        candidates = np.flatnonzero(self._overlaps(rect))
+        return bool(candidates.size) and bool(self._pixels_overlap(candidates, rect, mask).size)
+
+    def collide_bullets(self, bullets):
+        """Kill aliens and bullets that overlap, the same way as
+           pygame.sprite.groupcollide(bullets, aliens, True, True).
+           Returns a dictionary mapping each bullet that hit to the indices of the aliens it killed."""
+
+        collisions = {}
+        if not self.count or not bullets:
+            return collisions
+
+        # Test every bullet against every alien at once and only resolve the hits one bullet at a time.
+        # Bullets are resolved in group order so an alien can only be killed by one bullet.
+        bullet_list = bullets.sprites()
+        left, right, top, bottom = np.array(
+            [(b.rect.left, b.rect.right, b.rect.top, b.rect.bottom) for b in bullet_list]).T
+        hits = (self.alive
+                & (self.rect_x < right[:, None]) & (self.rect_x + self.width > left[:, None])
+                & (self.rect_y < bottom[:, None]) & (self.rect_y + self.height > top[:, None]))
+
+        for bullet_index in np.flatnonzero(hits.any(axis=1)):
+            killed = np.flatnonzero(hits[bullet_index] & self.alive)
+            if self.pixel_perfect and killed.size:
+                bullet = bullet_list[bullet_index]
+                killed = self._pixels_overlap(killed, bullet.rect, bullet.mask)
+            if killed.size:
+                self.alive[killed] = False
+                self.count -= int(killed.size)
+                collisions[bullet_list[bullet_index]] = killed
+                bullet_list[bullet_index].kill()
+        if collisions:
+            self._find_edges()
+        return collisions
+
+    def draw(self, surface):
+        """Draw every living alien onto the surface."""
+
+        positions = zip(self.rect_x[self.alive].tolist(), self.rect_y[self.alive].tolist())
+        surface.blits([(self.image, position) for position in positions], doreturn=False)
+
+    def bounding_rect(self):
+        """Return the smallest rect containing every living alien (None if the fleet is empty)."""
+
+        if self.edges is None:
+            return None
+        left_index, right_index, top_index, bottom_index = self.edges
+        left, top = int(self.rect_x[left_index]), int(self.rect_y[top_index])
+        right = int(self.rect_x[right_index]) + self.width
+        bottom = int(self.rect_y[bottom_index]) + self.height
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+
+class FleetBounds:
+    """A class to keep track of the outer edges of a fleet of Alien sprites without
+       looking at every alien each frame.
+
+       The fleet moves rigidly, so every alien in a column shares the same rect.left/right and
+       every alien in a row shares the same rect.top/bottom.  The bounds are read from one
+       representative alien in the outermost living column or row, so they follow the fleet's
+       horizontal shifts and drops for free.  A new representative is only looked up when the
+       current one is removed."""
+
+    def __init__(self):
+        """Initialize the bounds for an empty fleet."""
+        self.clear()
+
+    def clear(self):
+        """Forget every alien."""
+
+        self.columns = {}  # column number -> set of living aliens in that column
+        self.rows = {}     # row number -> set of living aliens in that row
+        self.left_alien = None
+        self.right_alien = None
+        self.top_alien = None
+        self.bottom_alien = None
+
+    def add(self, alien):
+        """Add an alien to the fleet, using its column and row numbers."""
+
+        self.columns.setdefault(alien.column, set()).add(alien)
+        self.rows.setdefault(alien.row, set()).add(alien)
+        if self.left_alien is None or alien.column < self.left_alien.column:
+            self.left_alien = alien
+        if self.right_alien is None or alien.column > self.right_alien.column:
+            self.right_alien = alien
+        if self.top_alien is None or alien.row < self.top_alien.row:
+            self.top_alien = alien
+        if self.bottom_alien is None or alien.row > self.bottom_alien.row:
+            self.bottom_alien = alien
+
+    def remove(self, alien):
+        """Remove an alien from the fleet and update the bounds if it was on the edge."""
+
+        column = self.columns[alien.column]
+        column.discard(alien)
+        if not column:
+            del self.columns[alien.column]
+        row = self.rows[alien.row]
+        row.discard(alien)
+        if not row:
+            del self.rows[alien.row]
+
+        # Only look up a new representative when the old one is gone
+        if alien is self.left_alien:
+            self.left_alien = self._any_alien(self.columns, min)
+        if alien is self.right_alien:
+            self.right_alien = self._any_alien(self.columns, max)
+        if alien is self.top_alien:
+            self.top_alien = self._any_alien(self.rows, min)
+        if alien is self.bottom_alien:
+            self.bottom_alien = self._any_alien(self.rows, max)
+
+    @staticmethod
+    def _any_alien(groups, pick):
+        """Return any alien from the column/row chosen by pick (min or max), or None if there are none."""
+
+        if not groups:
+            return None
+        return next(iter(groups[pick(groups)]))
+
+    def gunners(self):
+        """Return the x of the center and the y of the bottom of the lowest living alien in each column,
+           from the leftmost column to the rightmost (the aliens that can fire)."""
+
+        lowest = [max(self.columns[column], key=lambda alien: alien.row) for column in sorted(self.columns)]
+        return (np.array([alien.rect.centerx for alien in lowest]),
+                np.array([alien.rect.bottom for alien in lowest]))
+
+    def at_edge(self, screen_rect):
+        """Returns true if the fleet touches the left/right edge of the screen"""
+
+        if self.left_alien is None:
+            return False
+        return self.left_alien.rect.left <= 0 or self.right_alien.rect.right >= screen_rect.right
+
+    def at_bottom(self, screen_rect):
+        """Returns true if the fleet has reached the bottom of the screen"""
+
+        if self.bottom_alien is None:
+            return False
+        return self.bottom_alien.rect.bottom >= screen_rect.bottom
+
+    def rect(self):
+        """Return the smallest rect containing every living alien (None if the fleet is empty)."""
+
+        if self.left_alien is None:
+            return None
+        left, top = self.left_alien.rect.left, self.top_alien.rect.top
+        return pygame.Rect(left, top, self.right_alien.rect.right - left, self.bottom_alien.rect.bottom - top)
+
+
+class FleetImage:
+    """A class to draw the whole fleet with a single blit.
+
+       The fleet moves rigidly, so its living aliens are pre-composited onto one off-screen
+       surface laid out like the formation, and that surface is blitted at the fleet's position.
+       The surface only changes when a new fleet is built (composed on the next draw, so games
+       that are never drawn never pay for it) or an alien is removed (its cell is wiped),
+       so drawing costs the same no matter how many aliens there are.
+       The background color is transparent, so bullets inside the formation still show."""
+
+    def __init__(self, ai_game):
+        """Initialize the fleet image with the shared alien image."""
+
+        self.settings = ai_game.settings
+        self.alien_image = Assets.image('images/alien.bmp')
+        self.width, self.height = self.alien_image.get_size()
+        self.image = None
+        self.formation = (0, 0)
+        self.pending_cells = None  # Cells of the living aliens waiting to be composed
+
+    def build(self, number_columns, number_rows, cells=None):
+        """Start a new formation of aliens (laid out like AlienInvasion._create_alien).
+           cells is the list of (column, row) of the living aliens, every alien if None."""
+
+        if cells is None:
+            cells = [(column, row) for row in range(number_rows) for column in range(number_columns)]
+        self.formation = (number_columns, number_rows)
+        self.pending_cells = set(cells)
+
+    def _compose(self):
+        """Blit the living aliens of the formation onto a new image."""
+
+        # The alien in column 0, row 0 is at the top left of the image
+        number_columns, number_rows = self.formation
+        self.image = pygame.Surface((2 * self.width * number_columns - self.width,
+                                     2 * self.height * number_rows - self.height))
+        self.image.fill(self.settings.bg_color)
+        self.image.blits([(self.alien_image, self._cell(column, row)) for column, row in self.pending_cells],
+                         doreturn=False)
+        self.image.set_colorkey(self.settings.bg_color, pygame.RLEACCEL)
+        self.pending_cells = None
+
+    def _cell(self, column, row):
+        """Return the top left of the alien in column, row within the image."""
+        return 2 * self.width * column, 2 * self.height * row
+
+    def remove(self, column, row):
+        """Wipe the alien in column, row from the image."""
+
+        if self.pending_cells is not None:
+            self.pending_cells.discard((column, row))
+        else:
+            self.image.fill(self.settings.bg_color, (self._cell(column, row), (self.width, self.height)))
+
+    def draw(self, surface, alien_x, alien_y, column, row):
+        """Draw the fleet onto the surface, placed using the rect position of any living alien
+           and its column and row.  Returns the area drawn."""
+
+        if self.pending_cells is not None:
+            self._compose()
+        cell_x, cell_y = self._cell(column, row)
+        return surface.blit(self.image, (alien_x - cell_x, alien_y - cell_y))
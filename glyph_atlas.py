@@ -0,0 +1,73 @@
+import pygame
+
+
+class GlyphAtlas:
+    """A class to compose text from pre-rendered glyphs instead of rasterizing it with the font each time.
+       Each character is rendered once (in one font and color combination) and strings are built
+       by blitting the glyphs side by side.  Whole lines that are shown repeatedly can also be cached."""
+
+    def __init__(self, font, text_color, bg_color, characters=""):
+        """Initialize the atlas and pre-render the given characters."""
+
+        self.font = font
+        self.text_color = text_color
+        self.bg_color = bg_color
+        self.height = font.get_height()
+
+        self.glyphs = {}  # character -> rendered Surface
+        self.lines = {}   # whole line of text -> rendered Surface
+        for char in characters:
+            self._glyph(char)
+
+        # The most recent string composed, e.g. so a high score matching the score is free
+        self.last_text = None
+        self.last_image = None
+
+    def _glyph(self, char):
+        """Return the rendered image of a character, rendering it the first time it is needed."""
+
+        glyph = self.glyphs.get(char)
+        if glyph is None:
+            glyph = self._convert(self.font.render(char, True, self.text_color, self.bg_color))
+            self.glyphs[char] = glyph
+        return glyph
+
+    @staticmethod
+    def _convert(surface):
+        """Convert a surface to the display's pixel format (when there is a display) for faster blits."""
+
+        if pygame.display.get_surface() is not None:
+            return surface.convert()
+        return surface
+
+    def render(self, text):
+        """Return an image of the text composed from the glyphs."""
+
+        if text == self.last_text:
+            return self.last_image
+
+        glyphs = [self._glyph(char) for char in text]
+        image = pygame.Surface((sum(glyph.get_width() for glyph in glyphs), self.height))
+        image.fill(self.bg_color)
+        x = 0
+        for glyph in glyphs:
+            image.blit(glyph, (x, 0))
+            x += glyph.get_width()
+
+        self.last_text, self.last_image = text, self._convert(image)
+        return self.last_image
+
+    def render_line(self, text):
+        """Return an image of a line of text that is shown often, composing it only the first time."""
+
+        image = self.lines.get(text)
+        if image is None:
+            image = self.render(text)
+            self.lines[text] = image
+        return image
+
+    def preload(self, lines):
+        """Compose and cache lines of text ahead of time."""
+
+        for line in lines:
+            self.render_line(line)
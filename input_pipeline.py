@@ -0,0 +1,69 @@
+import time
+from collections import deque
+import pygame
+
+
+class InputPipeline:
+    """A class to apply the gameplay keys (fire, left, right) at the tick they were pressed in,
+       instead of all at once at the start of the next frame.
+
+       Key events are timestamped when they are read and queued.  The main loop reads events
+       every millisecond while it waits for the next frame, so the timestamps are close to the
+       real key presses.  Before each tick the events that happened before the end of that tick
+       are applied, so presses within one frame land on different ticks instead of being merged.
+       The delay between each key press and the tick applying it is kept to report input latency."""
+
+    keys = (pygame.K_SPACE, pygame.K_LEFT, pygame.K_RIGHT)
+
+    def __init__(self, ai_game, samples=1000):
+        """Initialize an empty queue, keeping the latency of the most recent key presses."""
+
+        self.ai_game = ai_game
+        self.events = deque()                   # (time.perf_counter() time, key, pressed) oldest first
+        self.latencies = deque(maxlen=samples)  # Seconds from key press to the tick applying it
+
+    def capture(self, key, pressed):
+        """Queue a key press or release that just happened."""
+        self.events.append((time.perf_counter(), key, pressed))
+
+    def apply_until(self, tick_end):
+        """Apply the events that happened before tick_end (a time.perf_counter() time)."""
+
+        events = self.events
+        if not events or events[0][0] > tick_end:
+            return
+
+        now = time.perf_counter()
+        while events and events[0][0] <= tick_end:
+            timestamp, key, pressed = events.popleft()
+            self.apply(key, pressed)
+            if pressed:
+                self.latencies.append(now - timestamp)
+                self.ai_game.profiler.record('input lag', now - timestamp)
+
+    def apply(self, key, pressed, fire=True):
+        """Apply a key press or release to the game now.  Presses of the fire key are ignored if not fire."""
+
+        if key == pygame.K_SPACE:
+            if pressed and fire:
+                self.ai_game.pending_fire = True  # Fired on the next tick
+        elif key == pygame.K_RIGHT:
+            self.ai_game.ship.moving_right = pressed
+        elif key == pygame.K_LEFT:
+            self.ai_game.ship.moving_left = pressed
+
+    def flush(self):
+        """Apply every queued event now, except shots (e.g. when the game logic pauses for a message)."""
+
+        while self.events:
+            _, key, pressed = self.events.popleft()
+            self.apply(key, pressed, fire=False)
+
+    def latency_stats(self):
+        """Return the average, 99th percentile, and max input latency in milliseconds (None if no samples)."""
+
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        return 1000 * sum(ordered) / len(ordered), 1000 * p99, 1000 * ordered[-1]
@@ -0,0 +1,27 @@
+class Overlay:
+    """A class to represent a timed phase shown on top of the game, such as the level start message,
+       the ship explosion, or the game over message.
+       The main loop keeps pumping events and redrawing while an overlay is shown,
+       and the game logic is paused until it finishes."""
+
+    def __init__(self, duration, message=None, on_finish=None):
+        """Initialize the overlay with its duration in seconds, an optional message box to draw,
+           and an optional function to call when it finishes."""
+
+        self.duration = duration
+        self.remaining = duration
+        self.message = message
+        self.on_finish = on_finish
+
+    def update(self, seconds):
+        """Count down the time left. Returns true once the overlay has finished."""
+
+        self.remaining -= seconds
+        return self.remaining <= 0
+
+    def draw(self):
+        """Draw the message box (if any) and return the area drawn."""
+
+        if self.message:
+            return self.message.draw_button()
+        return None
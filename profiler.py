@@ -0,0 +1,214 @@
+import json
+import time
+from collections import deque
+import pygame
+from assets import Assets
+
+
+class StartupTimer:
+    """A class to time the phases of starting the game, from creating the game to the first frame."""
+
+    def __init__(self):
+        """Start timing."""
+
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.phases = []  # (phase name, seconds) in the order they finished
+
+    def mark(self, name):
+        """Record the time since the previous phase finished as the phase name."""
+
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def mark_background(self, name):
+        """Record how long after the start a background task (e.g. loading sounds) finished."""
+        self.phases.append((name + ' (background)', time.perf_counter() - self.start))
+
+    def report(self):
+        """Return the phase times as text, one phase per line, with the total time to the last phase."""
+
+        lines = [f"{name:<28}{seconds * 1000:>9.1f} ms" for name, seconds in self.phases]
+        lines.append(f"{'total':<28}{(self.last - self.start) * 1000:>9.1f} ms")
+        return "\n".join(lines)
+
+
+class NullProfiler:
+    """Stand-in for FrameProfiler when profiling is switched off.  Nothing is timed or drawn."""
+
+    def end_frame(self):
+        """Nothing to record."""
+
+    def record(self, name, seconds):
+        """Nothing to record."""
+
+    def toggle_hud(self):
+        """Nothing to show."""
+
+    def draw(self):
+        """Nothing to draw, so no area was drawn."""
+        return None
+
+    def save(self):
+        """Nothing to save."""
+
+
+class FrameProfiler(NullProfiler):
+    """A class to time each phase of the main loop, frame by frame.
+
+       The game's methods for each phase are wrapped with timers on the game objects themselves,
+       so nothing in the game needs to change and there is no cost at all when the profiler is off.
+       Times are inclusive: a phase's time includes the phases it calls (e.g. step includes bullets).
+
+       Keeps a rolling window of per-frame totals to show the average and 99th percentile
+       of each phase on screen, and can keep the individual calls of recent frames
+       to export them as a Chrome trace (open in chrome://tracing or https://ui.perfetto.dev)."""
+
+    # Phase name -> (path of the object owning the method, from the game, method name)
+    PHASES = {
+        'events': ('', '_check_events'),
+        'overlays': ('', '_update_overlays'),
+        'step': ('', 'step'),
+        'ship': ('ship', 'update'),
+        'bullets': ('', '_update_bullets'),
+        'collisions': ('', '_check_bullet_alien_collisions'),
+        'aliens': ('', '_update_aliens'),
+        'alien fire': ('', '_update_alien_fire'),
+        'level start': ('', '_start_level'),
+        'prep_score': ('sb', 'prep_score'),
+        'prep_high_score': ('sb', 'prep_high_score'),
+        'prep_level': ('sb', 'prep_level'),
+        'prep_ships': ('sb', 'prep_ships'),
+        'draw': ('', '_update_gaming_elements'),
+        'present': ('renderer', 'present'),
+    }
+
+    def __init__(self, ai_game):
+        """Initialize the timers and wrap the game's methods for each phase."""
+
+        self.settings = ai_game.settings
+        self.screen = ai_game.screen
+        self.timer = time.perf_counter
+
+        # Time spent in each phase so far this frame, and in each of the frames in the window
+        self.frame_totals = dict.fromkeys(self.PHASES, 0.0)
+        self.history = {name: deque(maxlen=self.settings.profiler_window) for name in self.PHASES}
+        self.history['frame'] = deque(maxlen=self.settings.profiler_window)
+        self.frame_start = self.timer()
+
+        # Individual calls of the most recent frames, for the trace
+        self.tracing = self.settings.profiler_trace_path is not None
+        self.trace_frames = deque(maxlen=self.settings.profiler_trace_frames)
+        self.frame_events = []
+
+        # On screen timings, refreshed a few times a second rather than every frame
+        self.show_hud = self.settings.profiler_hud
+        self.font = Assets.font(None, 20)
+        self.text_color = (30, 30, 30)
+        self.hud_image = None
+        self.hud_rect = None
+        self.frames_until_refresh = 0
+
+        for name, (path, method_name) in self.PHASES.items():
+            owner = ai_game
+            for attribute in filter(None, path.split('.')):
+                owner = getattr(owner, attribute)
+            setattr(owner, method_name, self._timed(name, getattr(owner, method_name)))
+
+    def _timed(self, name, method):
+        """Return a function that calls method and adds the time it took to the phase."""
+
+        timer = self.timer
+        frame_totals = self.frame_totals
+
+        def timed(*args, **kwargs):
+            start = timer()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                end = timer()
+                frame_totals[name] += end - start
+                if self.tracing:
+                    self.frame_events.append((name, start, end))
+        return timed
+
+    def end_frame(self):
+        """Close the current frame: store its phase totals and start counting the next one."""
+
+        now = self.timer()
+        for name, total in self.frame_totals.items():
+            self.history[name].append(total)
+            self.frame_totals[name] = 0.0
+        self.history['frame'].append(now - self.frame_start)
+
+        if self.tracing:
+            self.frame_events.append(('frame', self.frame_start, now))
+            self.trace_frames.append(self.frame_events)
+            self.frame_events = []
+        self.frame_start = now
+
+    def record(self, name, seconds):
+        """Add a single measurement (e.g. the latency of a key press) to the statistics shown."""
+
+        history = self.history.get(name)
+        if history is None:
+            history = self.history[name] = deque(maxlen=self.settings.profiler_window)
+        history.append(seconds)
+
+    def stats(self):
+        """Return phase name -> (average, 99th percentile) of the per-frame times in milliseconds."""
+
+        stats = {}
+        for name, times in self.history.items():
+            if times:
+                ordered = sorted(times)
+                p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+                stats[name] = (1000 * sum(ordered) / len(ordered), 1000 * p99)
+        return stats
+
+    def toggle_hud(self):
+        """Show or hide the on screen timings."""
+        self.show_hud = not self.show_hud
+
+    def _prep_hud(self):
+        """Turn the rolling averages and 99th percentiles into a rendered image."""
+
+        lines = [f"{'phase':<16}{'avg ms':>8}{'p99 ms':>8}"]
+        lines.extend(f"{name:<16}{average:>8.2f}{p99:>8.2f}" for name, (average, p99) in self.stats().items())
+        images = [self.font.render(line, True, self.text_color, self.settings.bg_color) for line in lines]
+
+        self.hud_image = pygame.Surface((max(image.get_width() for image in images),
+                                         sum(image.get_height() for image in images)))
+        self.hud_image.fill(self.settings.bg_color)
+        y = 0
+        for image in images:
+            self.hud_image.blit(image, (0, y))
+            y += image.get_height()
+        self.hud_rect = self.hud_image.get_rect()
+        self.hud_rect.left = 10
+        self.hud_rect.top = 80
+
+    def draw(self):
+        """Draw the timings on screen (if shown). Returns the area drawn."""
+
+        if not self.show_hud:
+            return None
+        if self.frames_until_refresh <= 0:
+            self._prep_hud()
+            self.frames_until_refresh = self.settings.profiler_hud_refresh_frames
+        self.frames_until_refresh -= 1
+        return self.screen.blit(self.hud_image, self.hud_rect)
+
+    def save(self):
+        """Write the traced frames to the trace file as Chrome trace JSON (if tracing)."""
+
+        if not self.tracing:
+            return
+
+        # Complete ('X') events with times in microseconds; nested calls show up stacked
+        events = [{'name': name, 'ph': 'X', 'pid': 1, 'tid': 1,
+                   'ts': round(start * 1e6, 3), 'dur': round((end - start) * 1e6, 3)}
+                  for frame in self.trace_frames for name, start, end in frame]
+        with open(self.settings.profiler_trace_path, 'w') as trace_file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, trace_file)
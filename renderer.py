@@ -0,0 +1,78 @@
+import pygame
+
+
+class FullRedrawRenderer:
+    """A class to put each frame on screen by redrawing everything.
+       The whole screen is filled with the background color and then flipped to the display."""
+
+    def __init__(self, ai_game):
+        """Initialize the renderer."""
+
+        # Shortcut variables to main gaming object
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+
+    def clear(self):
+        """Wipe the whole screen clean with the background color."""
+        self.screen.fill(self.settings.bg_color)
+
+    def add(self, rect):
+        """Nothing to track, the whole screen is always updated."""
+
+    def invalidate(self):
+        """Nothing to do, the whole screen is always redrawn."""
+
+    def present(self):
+        """Make the most recently drawn screen visible (nothing to do without a display, e.g. headless)."""
+
+        if pygame.display.get_surface() is not None:
+            pygame.display.flip()
+
+
+class DirtyRectRenderer(FullRedrawRenderer):
+    """A class to put each frame on screen by only updating the parts that changed.
+       Every area drawn in a frame is remembered.  The next frame only wipes those areas
+       and only pushes the old and new areas to the display."""
+
+    def __init__(self, ai_game):
+        """Initialize the renderer and force a full redraw for the first frame."""
+
+        super().__init__(ai_game)
+        self.previous_rects = []  # Areas drawn in the previous frame
+        self.current_rects = []   # Areas drawn so far in this frame
+        self.full_redraw = True
+
+    def clear(self):
+        """Wipe the areas drawn in the previous frame (or everything after an invalidate)."""
+
+        if self.full_redraw:
+            self.screen.fill(self.settings.bg_color)
+        else:
+            for rect in self.previous_rects:
+                self.screen.fill(self.settings.bg_color, rect)
+
+    def add(self, rect):
+        """Remember an area that was drawn in this frame."""
+
+        if rect:
+            self.current_rects.append(rect)
+
+    def invalidate(self):
+        """Redraw the whole screen next frame, e.g. after something was drawn outside the renderer."""
+
+        self.full_redraw = True
+        self.previous_rects = []
+        self.current_rects = []
+
+    def present(self):
+        """Push the areas that changed to the display.
+           Without a display (e.g. headless) only the areas drawn are remembered for the next frame."""
+
+        if pygame.display.get_surface() is None:
+            self.full_redraw = False
+        elif self.full_redraw:
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            pygame.display.update(self.previous_rects + self.current_rects)
+        self.previous_rects, self.current_rects = self.current_rects, []
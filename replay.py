@@ -0,0 +1,262 @@
+import sys
+from ast import literal_eval
+from settings import Settings
+from tick_input import TickInput
+
+
+# Replay files start with this magic number and format version
+MAGIC = b'AIRP'
+VERSION = 2
+
+# Settings of games recorded by older versions that differ from today's defaults
+# (version 1 replays were recorded before the aliens fired back)
+LEGACY_SETTINGS = {1: {'alien_fire_rates': (0.0,)}}
+
+# Settings that change how the game plays out, stored in the replay so it can be reproduced
+GAMEPLAY_SETTINGS = ('screen_width', 'screen_height', 'ship_limit',
+                     'bullet_width', 'bullet_height', 'bullets_allowed',
+                     'fleet_drop_speed', 'speedup_scale', 'score_scale',
+                     'reference_fps', 'ticks_per_second',
+                     'alien_fire_rates', 'alien_fire_seed', 'alien_shot_speed', 'alien_shot_drift',
+                     'alien_shot_width', 'alien_shot_height', 'pixel_perfect_collisions')
+
+
+def _write_varint(buffer, value):
+    """Append a non-negative int of any size to the buffer using as few bytes as possible (LEB128)."""
+
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            buffer.append(byte | 0x80)
+        else:
+            buffer.append(byte)
+            return
+
+
+def _write_text(buffer, text):
+    """Append a length-prefixed UTF-8 string to the buffer."""
+
+    encoded = text.encode('utf-8')
+    _write_varint(buffer, len(encoded))
+    buffer.extend(encoded)
+
+
+def _read_text(data, position):
+    """Read a string written by _write_text. Returns the string and the position after it."""
+
+    length, position = _read_varint(data, position)
+    return bytes(data[position:position + length]).decode('utf-8'), position + length
+
+
+def _read_varint(data, position):
+    """Read a varint written by _write_varint. Returns the value and the position after it."""
+
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, position
+
+
+class Replay:
+    """A class to hold a recorded game: the player's input for every tick, the settings needed to
+       reproduce it, and the outcome of the game so playback can be checked against it.
+
+       File format: the magic number and version, then the gameplay settings as (name, value) text pairs.
+       Then the inputs, run-length encoded as (input byte, varint run length) pairs since the same
+       keys are usually held down for many ticks.  The outcome follows as varints."""
+
+    # Outcome values stored at the end of the file, in order
+    outcome_fields = ('ticks', 'score', 'high_score', 'level', 'ships_left', 'game_active')
+
+    def __init__(self, settings, inputs=None, outcome=None):
+        """Initialize a replay of a game played with the given dictionary of gameplay settings."""
+
+        self.settings = settings
+        self.inputs = inputs if inputs is not None else bytearray()  # One TickInput per tick
+        self.outcome = outcome  # Dictionary of outcome_fields plus the list of ship_losses
+
+    def to_bytes(self):
+        """Encode the replay in its compact binary format."""
+
+        data = bytearray(MAGIC)
+        data.append(VERSION)
+
+        # Values are stored as their repr so floats come back exactly
+        _write_varint(data, len(self.settings))
+        for name, value in self.settings.items():
+            _write_text(data, name)
+            _write_text(data, repr(value))
+
+        # Run-length encode the inputs
+        runs = []
+        for tick_input in self.inputs:
+            if runs and runs[-1][0] == tick_input:
+                runs[-1][1] += 1
+            else:
+                runs.append([tick_input, 1])
+        _write_varint(data, len(runs))
+        for tick_input, length in runs:
+            data.append(tick_input)
+            _write_varint(data, length)
+
+        # The outcome, including the ticks on which ships were lost
+        for field in self.outcome_fields:
+            _write_varint(data, int(self.outcome[field]))
+        _write_varint(data, len(self.outcome['ship_losses']))
+        for tick in self.outcome['ship_losses']:
+            _write_varint(data, tick)
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Decode a replay from its compact binary format."""
+
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not an Alien Invasion replay.")
+        version = data[len(MAGIC)]
+        if version != VERSION and version not in LEGACY_SETTINGS:
+            raise ValueError(f"Unsupported replay version {version}.")
+        position = len(MAGIC) + 1
+
+        settings = dict(LEGACY_SETTINGS.get(version, {}))
+        number_settings, position = _read_varint(data, position)
+        for _ in range(number_settings):
+            name, position = _read_text(data, position)
+            value, position = _read_text(data, position)
+            settings[name] = literal_eval(value)
+
+        inputs = bytearray()
+        number_runs, position = _read_varint(data, position)
+        for _ in range(number_runs):
+            tick_input = data[position]
+            length, position = _read_varint(data, position + 1)
+            inputs.extend(bytes((tick_input,)) * length)
+
+        outcome = {}
+        for field in cls.outcome_fields:
+            outcome[field], position = _read_varint(data, position)
+        outcome['game_active'] = bool(outcome['game_active'])
+        number_losses, position = _read_varint(data, position)
+        outcome['ship_losses'] = []
+        for _ in range(number_losses):
+            tick, position = _read_varint(data, position)
+            outcome['ship_losses'].append(tick)
+
+        return cls(settings, inputs=inputs, outcome=outcome)
+
+    def save(self, path):
+        """Write the replay to a file."""
+
+        with open(path, 'wb') as replay_file:
+            replay_file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        """Read a replay from a file."""
+
+        with open(path, 'rb') as replay_file:
+            return cls.from_bytes(replay_file.read())
+
+
+def game_outcome(ai_game):
+    """Return the parts of a game's state that a replay must reproduce exactly."""
+
+    return {'ticks': ai_game.ticks,
+            'score': ai_game.stats.score,
+            'high_score': ai_game.stats.high_score,
+            'level': ai_game.stats.level,
+            'ships_left': ai_game.stats.ships_left,
+            'game_active': ai_game.stats.game_active,
+            'ship_losses': list(ai_game.ship_losses)}
+
+
+class ReplayRecorder:
+    """A class to record the input of every tick of a game so it can be saved as a Replay."""
+
+    def __init__(self, ai_game):
+        """Initialize an empty recording for the game."""
+
+        self.ai_game = ai_game
+        self.inputs = bytearray()
+        self.outcome_before_start = None  # Outcome of the last tick recorded, if a game started after it
+
+    def record(self, tick_input):
+        """Remember the input applied on one tick."""
+
+        self.inputs.append(tick_input)
+        if tick_input & TickInput.START:
+            self.outcome_before_start = None
+
+    def game_starting(self):
+        """Remember the outcome before a new game resets it.  The game starts as soon as the key
+           is pressed, but its START is only recorded on the next tick, so until then the replay
+           ends with the outcome from before the start."""
+
+        if self.outcome_before_start is None:
+            self.outcome_before_start = game_outcome(self.ai_game)
+
+    def replay(self):
+        """Return the recording so far as a Replay, along with the outcome after its last tick."""
+
+        settings = {name: getattr(self.ai_game.settings, name) for name in GAMEPLAY_SETTINGS}
+        outcome = self.outcome_before_start or game_outcome(self.ai_game)
+        return Replay(settings, bytearray(self.inputs), outcome)
+
+    def save(self, path):
+        """Save the recording so far to a replay file."""
+        self.replay().save(path)
+
+
+class ReplayPlayer:
+    """A class to play a Replay back through the game's normal code paths, as fast as possible."""
+
+    def __init__(self, replay):
+        """Initialize the player with the replay to play."""
+        self.replay = replay
+
+    def make_game(self, settings=None):
+        """Create a headless game set up the same way as the recorded one."""
+
+        # Imported here since the game itself imports this module to record replays
+        from alien_invasion import AlienInvasion
+
+        settings = settings if settings else Settings()
+        settings.headless_mode = True
+        for name, value in self.replay.settings.items():
+            setattr(settings, name, value)
+        return AlienInvasion(settings)
+
+    def play(self, ai_game=None):
+        """Feed every recorded tick's input to the game. Returns the outcome of the game."""
+
+        if ai_game is None:
+            ai_game = self.make_game()
+
+        for tick_input in self.replay.inputs:
+            if tick_input & TickInput.START and not ai_game.stats.game_active:
+                ai_game.start_game()
+            ai_game.step(tick_input)
+        return game_outcome(ai_game)
+
+    def verify(self, ai_game=None):
+        """Play the replay and return true if it reproduces the recorded outcome exactly."""
+        return self.play(ai_game) == self.replay.outcome
+
+
+if __name__ == '__main__':
+    # Play back a replay file and check that it reproduces the recorded game.
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python replay.py <replay file>")
+    player = ReplayPlayer(Replay.load(sys.argv[1]))
+    outcome = player.play()
+    for name, value in outcome.items():
+        print(f"{name}: {value}")
+    matches = outcome == player.replay.outcome
+    print("Replay reproduces the recorded game." if matches else "Replay does NOT match the recorded game!")
+    sys.exit(0 if matches else 1)
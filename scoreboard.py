@@ -1,10 +1,11 @@
-import pygame.font
-from pygame.sprite import Group
-from ship import Ship
+import pygame
+from assets import Assets
 
 
 class Scoreboard:
-    """A class to report scoring information."""
+    """A class to report scoring information.
+       The score, high score, level, and remaining ships are composited into one cached HUD layer
+       that is only rebuilt when one of them changes, and is drawn with a single blit."""
 
     def __init__(self, ai_game):
         """Initialize score-keeping attributes"""
@@ -17,8 +18,19 @@ class Scoreboard:
         self.stats = ai_game.stats
 
         # Font setting for scoring information.
+        # Scores and levels are composed from pre-rendered digits instead of rendering the font each time.
         self.text_color = (30, 30, 30)
-        self.font = pygame.font.SysFont(None, 48)
+        self.font = Assets.font(None, 48)
+        self.atlas = Assets.glyph_atlas(None, 48, self.text_color, self.settings.bg_color, "0123456789,L ")
+
+        # Every remaining ship is drawn with the same shared ship image
+        self.ship_image = Assets.image('images/ship.bmp')
+
+        # Values shown in the HUD layer (None until prepped), and the layer itself
+        self.shown = {'score': None, 'high_score': None, 'level': None, 'ships': None}
+        self.hud_image = None
+        self.hud_rect = None
+        self.hud_rects = []  # Areas of the screen covered by each part of the HUD
 
         # Prepare the initial score, level, and ship count
         self.prep_score()
@@ -26,15 +38,25 @@ class Scoreboard:
         self.prep_level()
         self.prep_ships()
 
+    def _changed(self, name, value):
+        """Remember the value about to be shown. Returns true (and marks the HUD for rebuilding) if it changed."""
+
+        if self.shown[name] == value:
+            return False
+        self.shown[name] = value
+        self.hud_image = None
+        return True
+
     def prep_score(self):
         """Turn the score into a rendered image"""
 
         # rounded_score = round(self.stats.score, -1)  # Round to the nearest 10s
         rounded_score = self.stats.score  # Score not rounded
+        if not self._changed('score', rounded_score):
+            return
         score_str = "{:,}".format(rounded_score)
 
-        self.score_image = self.font.render(score_str, True,
-                                            self.text_color, self.settings.bg_color)
+        self.score_image = self.atlas.render(score_str)
 
         # Position the score at the top right of the screen.
         self.score_rect = self.score_image.get_rect()
@@ -46,11 +68,12 @@ class Scoreboard:
 
         # high_score = round(self.stats.high_score, -1)  # Round to the nearest 10s
         high_score =self.stats.high_score  # Score not rounded 
+        if not self._changed('high_score', high_score):
+            return
 
         high_score_str = "{:,}".format(high_score)
 
-        self.high_score_image = self.font.render(high_score_str, True,
-                                                 self.text_color, self.settings.bg_color)
+        self.high_score_image = self.atlas.render(high_score_str)
 
         # Position the score at the top center of the screen.
         self.high_score_rect = self.high_score_image.get_rect()
@@ -60,10 +83,11 @@ class Scoreboard:
     def prep_level(self):
         """Turn the level into a rendered image"""
 
+        if not self._changed('level', self.stats.level):
+            return
         level_str = f"L {self.stats.level}"
 
-        self.level_image = self.font.render(level_str, True,
-                                            self.text_color, self.settings.bg_color)
+        self.level_image = self.atlas.render(level_str)
 
         # Position the level to the top left.
         self.level_rect = self.level_image.get_rect()
@@ -74,23 +98,42 @@ class Scoreboard:
         """Show how many ships are remaining graphically
            by showing ship images in the top left."""
 
-        # Group is a pygame way to organize Sprites
-        self.ships = Group()
+        if not self._changed('ships', self.stats.ships_left):
+            return
 
         # Put the remaining ships in the top left with a little spacing
+        self.ship_rects = []
         for ship_number in range(self.stats.ships_left):
-            ship = Ship(self.ai_game)
-            ship.rect.x = 10 + ship_number * ship.rect.width
-            ship.rect.y = 10
-            self.ships.add(ship)
+            ship_rect = self.ship_image.get_rect()
+            ship_rect.x = 10 + ship_number * ship_rect.width
+            ship_rect.y = 10
+            self.ship_rects.append(ship_rect)
+
+    def _prep_hud(self):
+        """Composite the score, high score, level, and remaining ships into one image."""
+
+        images = [(self.score_image, self.score_rect),
+                  (self.high_score_image, self.high_score_rect),
+                  (self.level_image, self.level_rect)]
+        images.extend((self.ship_image, ship_rect) for ship_rect in self.ship_rects)
+        self.hud_rects = [rect for _, rect in images]
+        self.hud_rect = self.hud_rects[0].unionall(self.hud_rects[1:])
+
+        # The background is transparent, so aliens passing under the HUD still show between its parts
+        self.hud_image = pygame.Surface(self.hud_rect.size, 0, self.screen)
+        self.hud_image.fill(self.settings.bg_color)
+        self.hud_image.blits([(image, rect.move(-self.hud_rect.x, -self.hud_rect.y)) for image, rect in images],
+                             doreturn=False)
+        self.hud_image.set_colorkey(self.settings.bg_color, pygame.RLEACCEL)
 
     def show_score(self):
-        """Draw score, high score, level, and remaining ships to screen."""
+        """Draw score, high score, level, and remaining ships to screen.
+           Returns the list of areas drawn."""
 
-        self.screen.blit(self.score_image, self.score_rect)
-        self.screen.blit(self.high_score_image, self.high_score_rect)
-        self.screen.blit(self.level_image, self.level_rect)
-        self.ships.draw(self.screen)
+        if self.hud_image is None:
+            self._prep_hud()
+        self.screen.blit(self.hud_image, self.hud_rect)
+        return self.hud_rects
 
     def check_high_score(self):
         """Check to see if there's a new high score."""
@@ -99,3 +142,31 @@ class Scoreboard:
         if self.stats.score > self.stats.high_score:
             self.stats.high_score = self.stats.score
             self.prep_high_score()
+
+
+class HeadlessScoreboard(Scoreboard):
+    """A scoreboard that keeps the high score up to date but renders nothing.
+       Used in headless mode where no fonts or display are available."""
+
+    def __init__(self, ai_game):
+        """Initialize score-keeping attributes without any fonts or images."""
+
+        self.ai_game = ai_game
+        self.settings = ai_game.settings
+        self.stats = ai_game.stats
+
+    def prep_score(self):
+        """Nothing to render in headless mode."""
+
+    def prep_high_score(self):
+        """Nothing to render in headless mode."""
+
+    def prep_level(self):
+        """Nothing to render in headless mode."""
+
+    def prep_ships(self):
+        """Nothing to render in headless mode."""
+
+    def show_score(self):
+        """Nothing to draw in headless mode."""
+        return []
@@ -7,12 +7,72 @@ class Settings:
 		"""Initialize the game's static settings."""
 
 		# Screen settings.
-		# If full_screen_mode=TRUE, then the screen width, height will be determined at runtime
-		# Otherwise, the game will use the width and height specified below
+		# The game uses the width and height specified below, unless full_screen_mode=TRUE with
+		# full_screen_scaling='native', in which case they are determined at runtime
 		self.full_screen_mode = False
+		# How full screen mode fills the monitor: 'scaled' plays on a screen_width x screen_height screen
+		# scaled up to the monitor (same gameplay and drawing cost on every monitor),
+		# 'native' plays at the monitor's resolution (the fleet layout and drawing cost grow with it)
+		self.full_screen_scaling = 'scaled'
 		self.screen_width = 1080
 		self.screen_height = 720
 		self.bg_color = cc.color['lighter gray']  # Medium Grey Background (230, 230, 230)
+		# 'dirty' only redraws the parts of the screen that changed, 'full' redraws everything each frame
+		self.render_mode = 'dirty'
+		# 'sprites' blits each alien every frame, 'composite' blits the whole fleet as one pre-composited image
+		self.fleet_draw_mode = 'composite'
+
+		# Headless mode runs the game logic only: no window, no sound mixer, and no pauses.
+		# Used to simulate games as fast as possible (e.g. on servers without a display).
+		self.headless_mode = False
+
+		# Print how long each phase of startup took, once the first frame is on screen
+		self.report_startup = False
+
+		# Game loop timing.
+		# The game logic advances in fixed time steps (ticks) so gameplay is the same on every machine.
+		# Speeds below are in pixels per frame at the reference frame rate and are scaled
+		# to the tick length, so changing ticks_per_second does not change how fast things move.
+		self.reference_fps = 240
+		self.ticks_per_second = 240     # Fixed simulation rate
+		self.max_fps = 60               # Render rate cap, 0 to render as fast as possible
+		self.max_ticks_per_frame = 10   # Drop simulation time instead of falling further behind
+
+		# How long (in seconds) the level start, explosion, and game over messages are shown.
+		# The game is paused while they are shown.  Headless mode skips them.
+		self.level_start_duration = 2.0
+		self.explosion_duration = 1.0
+		self.final_explosion_duration = 0.75
+		self.game_over_duration = 1.5
+
+		# Record every tick of input to this replay file when quitting (None to not record).
+		# Play a replay back with: python replay.py <replay file>
+		self.replay_record_path = None
+
+		# Frame profiler: times each phase of the main loop (events, bullets, collisions, drawing, ...).
+		# Shows the rolling average and 99th percentile per phase on screen (F3 toggles it),
+		# and writes the most recent frames as a Chrome trace on quit (if a path is given).
+		self.profiler_enabled = False
+		self.profiler_hud = True
+		self.profiler_window = 240              # Frames in the rolling statistics
+		self.profiler_hud_refresh_frames = 30   # Frames between updates of the on screen timings
+		self.profiler_trace_path = None
+		self.profiler_trace_frames = 600        # Most recent frames kept for the trace
+
+		# Telemetry: stream the state of the game, tick by tick, to spectators on localhost
+		# (python telemetry.py <port> follows a game).  None switches it off.
+		self.telemetry_port = None
+		self.telemetry_host = '127.0.0.1'
+		self.telemetry_interval = 1 / 60       # Seconds between sends to the spectators
+		self.telemetry_client_backlog = 60     # Sends queued for a slow spectator before it skips ahead
+
+		# Sound effects: name -> (sound file, volume, mixer channels reserved for it,
+		# minimum seconds between two plays of it).  Headless mode has no sound.
+		self.sound_effects = {
+			'shoot': ('sounds/shoot.wav', 0.2, 2, 0.05),
+			'invader': ('sounds/invaderkilled.wav', 0.1, 2, 0.03),
+			'explosion': ('sounds/explosion2.wav', 1.0, 1, 0.0)}
+		self.max_sound_voices = 4  # Most sound effects playing at the same time
 
 		# Ship settings
 		self.ship_limit = 2  # Number of additional ships at startup
@@ -25,6 +85,32 @@ class Settings:
 
 		# Alien settings
 		self.fleet_drop_speed = 10  # How far the aliens march down when they hit a lateral edge (10)
+		# How the fleet is stored: 'sprite' (one Alien sprite per alien) or
+		# 'array' (NumPy arrays, much faster for large fleets)
+		self.fleet_backend = 'sprite'
+
+		# Collision detection between the sprite fleet and the bullets/ship.
+		# 'brute' tests every alien, 'grid' only tests aliens near each bullet using a spatial hash
+		# (pays off for large fleets or many bullets), and 'compare' runs both and
+		# raises an error if they ever disagree.
+		self.collision_broadphase = 'brute'
+		self.collision_grid_cell_size = 128  # Pixels per side of each grid cell
+		# Only count a collision when the sprites' pixels overlap, not just their rects.
+		# Pairs are first tested by rect, so the pixel test only runs on the few that overlap.
+		self.pixel_perfect_collisions = False
+
+		# Alien return fire.  The lowest alien of a random column fires at random, on average
+		# alien_fire_rates[level - 1] shots a second (the last rate is used for every level after it).
+		# Shots fall at alien_shot_speed and drift sideways by up to alien_shot_drift (pixels per frame).
+		# The shots are random but follow alien_fire_seed, so a game can be replayed exactly
+		# (None picks a new seed each time the game is launched, and stores it here).
+		self.alien_fire_rates = (0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 4.0, 6.0)
+		self.alien_fire_seed = None
+		self.alien_shot_speed = 1.5
+		self.alien_shot_drift = 0.25
+		self.alien_shot_width = 3
+		self.alien_shot_height = 12
+		self.alien_shot_color = (170, 40, 40)
 
 		# How quickly the game speeds up at the completion of each level.
 		self.speedup_scale = 1.1
@@ -50,3 +136,9 @@ class Settings:
 		self.bullet_speed *= self.speedup_scale
 		self.alien_speed *= self.speedup_scale
 		self.alien_points = int(self.alien_points * self.score_scale)
+
+	def alien_fire_rate(self, level):
+		"""Return the average number of shots a second the aliens fire on a level"""
+
+		rates = self.alien_fire_rates
+		return rates[min(level, len(rates)) - 1]
@@ -1,5 +1,5 @@
-import pygame
 from pygame.sprite import Sprite
+from assets import Assets
 
 
 class Ship(Sprite):
@@ -15,11 +15,13 @@ class Ship(Sprite):
         self.screen_rect = ai_game.screen.get_rect()
         self.settings = ai_game.settings
 
-        # Load the ship image and get its rect.
+        # Get the shared ship images and get its rect.
         self.exploded = False  # Determine if the ship should be normal or exploded
-        self.ship_alive = pygame.image.load('images/ship.bmp')
-        self.ship_dead = pygame.image.load('images/ship-exploded.bmp')
+        self.ship_alive = Assets.image('images/ship.bmp')
+        self.ship_dead = Assets.image('images/ship-exploded.bmp')
         self.image = self.ship_alive
+        # Only pixel perfect collisions need the mask (the ship is never hit once exploded)
+        self.mask = Assets.mask('images/ship.bmp') if self.settings.pixel_perfect_collisions else None
         self.rect = self.image.get_rect()
 
         # Start each new ship at the bottom center of the screen.
@@ -33,25 +35,21 @@ class Ship(Sprite):
         self.moving_left = False
 
     def blitme(self):
-        """Draw the ship at its current location."""
+        """Draw the ship at its current location and return the area drawn."""
         if self.exploded:
-            self.screen.blit(self.ship_dead, self.rect)
+            return self.screen.blit(self.ship_dead, self.rect)
         else:
-            self.screen.blit(self.ship_alive, self.rect)
+            return self.screen.blit(self.ship_alive, self.rect)
 
-    def explode_ship(self):
-        """Draw the exploded ship at its current location."""
-        self.exploded = True
-        self.blitme()
-
-    def update(self):
-        """Update the position based on the movement flag."""
+    def update(self, dt=1.0):
+        """Update the position based on the movement flag.
+           dt is the elapsed time in frames at the reference frame rate."""
 
         # calculate new x location as a float if you don't go off the screen
         if self.moving_right and self.rect.right < self.screen_rect.right:
-            self.x += self.settings.ship_speed
+            self.x += self.settings.ship_speed * dt
         if self.moving_left and self.rect.left > self.screen_rect.left:
-            self.x -= self.settings.ship_speed
+            self.x -= self.settings.ship_speed * dt
 
         # update rect object from self.x
         self.rect.x = self.x
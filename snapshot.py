@@ -0,0 +1,140 @@
+import pickle
+
+
+# Settings that change during a game (see Settings.initialize_dynamic_settings)
+DYNAMIC_SETTINGS = ('fleet_direction', 'ship_speed', 'bullet_speed', 'alien_speed', 'alien_points')
+
+# Game statistics (see GameStats)
+STATS = ('ships_left', 'score', 'level', 'high_score', 'games_completed', 'game_active')
+
+
+class GameSnapshot:
+    """A class to hold a copy of the complete live state of a game, as plain values only.
+
+       The game's sprites hold references back to the game and the screen, so they can't be copied.
+       A snapshot stores just the numbers: the ship, every bullet and alien (in group order, so the
+       restored game collides them in the same order), the aliens' shots and the state of the
+       random numbers deciding when they fire, the dynamic settings, the statistics, and the tick
+       count.  Restoring a snapshot puts recycled sprites back in the same places, so the game
+       carries on exactly as it would have from that tick.
+
+       Snapshots are taken between ticks.  Overlays being shown (messages, explosion pauses)
+       and replay recording are not part of the state."""
+
+    def __init__(self, ai_game):
+        """Copy the state of the game."""
+
+        settings, stats, ship = ai_game.settings, ai_game.stats, ai_game.ship
+
+        self.settings = {name: getattr(settings, name) for name in DYNAMIC_SETTINGS}
+        self.stats = {name: getattr(stats, name) for name in STATS}
+        self.ship = (ship.x, ship.rect.x, ship.rect.y, ship.moving_right, ship.moving_left, ship.exploded)
+        self.bullets = [(bullet.y, bullet.rect.x, bullet.rect.y) for bullet in ai_game.bullets.sprites()]
+
+        self.fleet_formation = ai_game.fleet_formation
+        if ai_game.array_fleet:
+            fleet = ai_game.aliens
+            self.aliens = (fleet.x.copy(), fleet.rect_x.copy(), fleet.rect_y.copy(), fleet.alive.copy(),
+                           fleet.columns.copy(), fleet.rows.copy(), fleet.count)
+        else:
+            self.aliens = [(alien.x, alien.y, alien.rect.x, alien.rect.y, alien.column, alien.row)
+                           for alien in ai_game.aliens.sprites()]
+
+        self.alien_shots = ai_game.alien_shots.state()
+        self.alien_fire_rng = ai_game.alien_fire_rng.bit_generator.state
+
+        self.ticks = ai_game.ticks
+        self.ship_losses = list(ai_game.ship_losses)
+        self.pending_fire = ai_game.pending_fire
+        self.pending_start = ai_game.pending_start
+
+    def restore(self, ai_game):
+        """Put the game back in the state the snapshot was taken in.
+           The game must use the same gameplay settings and fleet backend as the one snapshotted."""
+
+        settings, stats, ship = ai_game.settings, ai_game.stats, ai_game.ship
+
+        for name, value in self.settings.items():
+            setattr(settings, name, value)
+        for name, value in self.stats.items():
+            setattr(stats, name, value)
+        ship.x, ship.rect.x, ship.rect.y, ship.moving_right, ship.moving_left, ship.exploded = self.ship
+
+        # Recycle the bullets in play and hand them back out at the saved positions
+        ai_game.bullet_pool.release_group(ai_game.bullets)
+        for bullet_y, rect_x, rect_y in self.bullets:
+            bullet = ai_game.bullet_pool.acquire()
+            bullet.y, bullet.rect.x, bullet.rect.y = bullet_y, rect_x, rect_y
+            ai_game.bullets.add(bullet)
+
+        self._restore_fleet(ai_game)
+        ai_game.alien_shots.set_state(self.alien_shots)
+        ai_game.alien_fire_rng.bit_generator.state = self.alien_fire_rng
+
+        ai_game.ticks = self.ticks
+        ai_game.ship_losses = list(self.ship_losses)
+        ai_game.pending_fire = self.pending_fire
+        ai_game.pending_start = self.pending_start
+
+        # Nothing left from before the restore should play out or stay on screen
+        ai_game.overlays.clear()
+        ai_game.sb.prep_score()
+        ai_game.sb.prep_high_score()
+        ai_game.sb.prep_level()
+        ai_game.sb.prep_ships()
+        ai_game.renderer.invalidate()
+        ai_game.telemetry.invalidate()
+
+    def _restore_fleet(self, ai_game):
+        """Rebuild the fleet, its bounds, its collision grid, and its image from the saved aliens."""
+
+        ai_game.alien_grid.clear()
+        ai_game.fleet_bounds.clear()
+        ai_game.fleet_formation = self.fleet_formation
+
+        if ai_game.array_fleet:
+            fleet = ai_game.aliens
+            x, rect_x, rect_y, alive, columns, rows, fleet.count = self.aliens
+            fleet.x, fleet.rect_x, fleet.rect_y = x.copy(), rect_x.copy(), rect_y.copy()
+            fleet.alive, fleet.columns, fleet.rows = alive.copy(), columns.copy(), rows.copy()
+            fleet._find_edges()
+            cells = list(zip(columns[alive].tolist(), rows[alive].tolist()))
+        else:
+            ai_game.alien_pool.release_group(ai_game.aliens)
+            for x, y, rect_x, rect_y, column, row in self.aliens:
+                alien = ai_game.alien_pool.acquire()
+                alien.x, alien.y, alien.rect.x, alien.rect.y = x, y, rect_x, rect_y
+                alien.column, alien.row = column, row
+                ai_game.aliens.add(alien)
+                ai_game.fleet_bounds.add(alien)
+                if ai_game.use_alien_grid:
+                    ai_game.alien_grid.insert(alien, alien.rect)
+            cells = [(column, row) for _, _, _, _, column, row in self.aliens]
+
+        if ai_game.fleet_image:
+            ai_game.fleet_image.build(*self.fleet_formation, cells)
+
+    def to_bytes(self):
+        """Return the snapshot as compact bytes, e.g. to save to disk or send to another process."""
+        return pickle.dumps(self.__dict__, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Return the snapshot stored in bytes made by to_bytes."""
+
+        snapshot = cls.__new__(cls)
+        snapshot.__dict__.update(pickle.loads(data))
+        return snapshot
+
+    def save(self, path):
+        """Write the snapshot to a file."""
+
+        with open(path, 'wb') as snapshot_file:
+            snapshot_file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        """Read a snapshot from a file written by save."""
+
+        with open(path, 'rb') as snapshot_file:
+            return cls.from_bytes(snapshot_file.read())
@@ -0,0 +1,85 @@
+import time
+import pygame
+from assets import Assets
+
+
+class NullSoundManager:
+    """Stand-in for SoundManager when there is no sound (headless mode).  The mixer is never initialized."""
+
+    def play(self, name):
+        """Silently ignore requests to play a sound effect."""
+
+
+class SoundManager:
+    """A class to play the game's sound effects on mixer channels reserved for each effect.
+
+       Each effect gets its own channels, so a burst of one effect (e.g. rapid fire) can't cut off
+       another.  When all of an effect's channels are busy, its oldest sound is cut off.
+       The total number of sounds playing at once is capped, and an effect played again
+       sooner than its minimum interval is skipped, so wide bullets hitting several aliens
+       make one sound instead of a pile of them.
+
+       The mixer and sounds are loaded in the background (see Assets.load_sounds_in_background).
+       Effects are silent until they have loaded."""
+
+    def __init__(self, settings, on_loaded=None):
+        """Start loading the effects in settings.sound_effects.
+           on_loaded is called (from the loading thread) once they are ready to play."""
+
+        self.settings = settings
+        self.on_loaded = on_loaded
+        self.ready = False
+
+        self.sounds = {}        # effect name -> Sound
+        self.channels = {}      # effect name -> list of the Channels reserved for it
+        self.started = {}       # effect name -> when each of its channels started its current sound
+        self.last_played = dict.fromkeys(settings.sound_effects, float('-inf'))
+        self.all_channels = []
+
+        paths = [path for path, _, _, _ in settings.sound_effects.values()]
+        Assets.load_sounds_in_background(paths, self._set_up_channels)
+
+    def _set_up_channels(self):
+        """Reserve the channels for each effect and set the volumes (once the sounds have loaded)."""
+
+        # Reserved channels are never picked by Sound.play(), so only this manager uses them
+        total = sum(channels for _, _, channels, _ in self.settings.sound_effects.values())
+        pygame.mixer.set_num_channels(total)
+        pygame.mixer.set_reserved(total)
+
+        first = 0
+        for name, (path, volume, channels, _) in self.settings.sound_effects.items():
+            sound = Assets.sound(path)
+            sound.set_volume(volume)
+            self.sounds[name] = sound
+            self.channels[name] = [pygame.mixer.Channel(number) for number in range(first, first + channels)]
+            self.started[name] = [float('-inf')] * channels
+            first += channels
+        self.all_channels = [channel for channels in self.channels.values() for channel in channels]
+
+        self.ready = True
+        if self.on_loaded:
+            self.on_loaded()
+
+    def play(self, name):
+        """Play a sound effect, unless it played too recently or too many sounds are already playing."""
+
+        if not self.ready:
+            return
+
+        # Rate limit each effect
+        now = time.perf_counter()
+        if now - self.last_played[name] < self.settings.sound_effects[name][3]:
+            return
+
+        # Use a free channel of the effect, or cut off its oldest sound
+        channels, started = self.channels[name], self.started[name]
+        index = next((index for index, channel in enumerate(channels) if not channel.get_busy()), None)
+        if index is None:
+            index = started.index(min(started))
+        elif sum(other.get_busy() for other in self.all_channels) >= self.settings.max_sound_voices:
+            return  # Too many sounds playing already
+
+        channels[index].play(self.sounds[name])
+        started[index] = now
+        self.last_played[name] = now
@@ -0,0 +1,80 @@
+class SpatialHash:
+    """A uniform grid broadphase that buckets items by the grid cells their rects cover.
+       Looking up the items near a rect only visits the few cells that rect covers,
+       instead of testing every item.
+
+       Items that all move together (like the alien fleet) don't need to be re-inserted:
+       shift() moves the whole grid at once.  Queries are padded by a small margin so the
+       candidates always include every item that could overlap, even if an item's own
+       rounding puts it a pixel away from where the grid thinks it is.
+       Candidates still need an exact rect test."""
+
+    def __init__(self, cell_size, margin=2):
+        """Initialize an empty grid with square cells of cell_size pixels."""
+
+        self.cell_size = cell_size
+        self.margin = margin
+        self.clear()
+
+    def clear(self):
+        """Remove every item and reset the grid position."""
+
+        self.cells = {}       # (column, row) -> set of items in that cell
+        self.item_cells = {}  # item -> list of the cells it was inserted in
+        self.offset_x = 0.0   # How far all the items have moved since they were inserted
+        self.offset_y = 0.0
+
+    def __len__(self):
+        """Return the number of items in the grid."""
+        return len(self.item_cells)
+
+    def _cells_covering(self, left, top, right, bottom):
+        """Return the keys of the cells covering the area (in grid coordinates)."""
+
+        size = self.cell_size
+        return [(column, row)
+                for column in range(int(left // size), int((right - 1) // size) + 1)
+                for row in range(int(top // size), int((bottom - 1) // size) + 1)]
+
+    def insert(self, item, rect):
+        """Add an item covering rect (in screen coordinates)."""
+
+        keys = self._cells_covering(rect.left - self.offset_x, rect.top - self.offset_y,
+                                    rect.right - self.offset_x, rect.bottom - self.offset_y)
+        for key in keys:
+            self.cells.setdefault(key, set()).add(item)
+        self.item_cells[item] = keys
+
+    def remove(self, item):
+        """Remove an item from the grid, if it is there."""
+
+        for key in self.item_cells.pop(item, ()):
+            cell = self.cells[key]
+            cell.discard(item)
+            if not cell:
+                del self.cells[key]
+
+    def shift(self, dx, dy):
+        """Move every item in the grid by (dx, dy) pixels."""
+
+        self.offset_x += dx
+        self.offset_y += dy
+
+    def query(self, rect):
+        """Return the set of items that may overlap rect (in screen coordinates)."""
+
+        margin = self.margin
+        size = self.cell_size
+        left = int((rect.left - margin - self.offset_x) // size)
+        right = int((rect.right + margin - 1 - self.offset_x) // size)
+        top = int((rect.top - margin - self.offset_y) // size)
+        bottom = int((rect.bottom + margin - 1 - self.offset_y) // size)
+
+        candidates = set()
+        cells = self.cells
+        for column in range(left, right + 1):
+            for row in range(top, bottom + 1):
+                cell = cells.get((column, row))
+                if cell:
+                    candidates.update(cell)
+        return candidates
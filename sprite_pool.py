@@ -0,0 +1,33 @@
+class SpritePool:
+    """A class to recycle sprites instead of creating new ones.
+       Released sprites are kept and handed out again by acquire(), after calling their reset() method.
+       Cuts down on allocations (and garbage collection) in long games."""
+
+    def __init__(self, factory):
+        """Initialize an empty pool that uses factory() to create new sprites when it runs out."""
+
+        self.factory = factory
+        self.free = []  # Sprites ready to be reused
+
+    def acquire(self):
+        """Return a recycled sprite, or a brand new one if there are none to reuse."""
+
+        if self.free:
+            sprite = self.free.pop()
+            sprite.reset()
+            return sprite
+        return self.factory()
+
+    def release(self, sprite):
+        """Return a sprite that is no longer in play to the pool."""
+        self.free.append(sprite)
+
+    def release_all(self, sprites):
+        """Return several sprites that are no longer in play to the pool."""
+        self.free.extend(sprites)
+
+    def release_group(self, group):
+        """Empty a group, returning all of its sprites to the pool."""
+
+        self.free.extend(group.sprites())
+        group.empty()
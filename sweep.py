@@ -0,0 +1,194 @@
+import os
+import csv
+import sys
+import time
+import argparse
+import itertools
+from ast import literal_eval
+from concurrent.futures import ProcessPoolExecutor
+
+# Keep the worker processes quiet when they import pygame
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from settings import Settings
+from alien_invasion import AlienInvasion
+from tick_input import TickInput
+from replay import Replay
+
+
+def idle_policy(ai_game):
+    """Never move or fire, useful as a baseline for how long the fleet takes to land."""
+    return TickInput.NONE
+
+
+def sweeper_policy(ai_game):
+    """Sweep back and forth across the screen while firing as fast as possible."""
+
+    # Ticks needed to cross the screen at the current ship speed
+    crossing = ai_game.settings.screen_width / (ai_game.settings.ship_speed * ai_game.tick_dt)
+    direction = TickInput.RIGHT if (ai_game.ticks // max(int(crossing), 1)) % 2 == 0 else TickInput.LEFT
+    return direction | TickInput.FIRE
+
+
+def hunter_policy(ai_game):
+    """Move under the closest alien in the lowest row of the fleet and fire."""
+
+    if not ai_game.aliens:
+        return TickInput.NONE
+
+    if ai_game.array_fleet:
+        fleet = ai_game.aliens
+        lowest = fleet.alive & (fleet.rect_y == fleet.rect_y[fleet.alive].max())
+        targets = (fleet.rect_x[lowest] + fleet.width // 2).tolist()
+    else:
+        rows = ai_game.fleet_bounds.rows
+        targets = [alien.rect.centerx for alien in rows[max(rows)]]
+
+    ship_x = ai_game.ship.rect.centerx
+
+    target_x = min(targets, key=lambda x: abs(x - ship_x))
+    if target_x > ship_x + 2:
+        return TickInput.RIGHT | TickInput.FIRE
+    if target_x < ship_x - 2:
+        return TickInput.LEFT | TickInput.FIRE
+    return TickInput.FIRE
+
+
+class ScriptedPolicy:
+    """Play the inputs of a replay file, one per tick, then stand still."""
+
+    def __init__(self, path):
+        """Load the inputs to play from a replay file."""
+        self.inputs = Replay.load(path).inputs
+
+    def __call__(self, ai_game):
+        """Return the recorded input for the game's current tick."""
+
+        if ai_game.ticks < len(self.inputs):
+            return self.inputs[ai_game.ticks] & ~TickInput.START
+        return TickInput.NONE
+
+
+POLICIES = {'idle': idle_policy, 'sweeper': sweeper_policy, 'hunter': hunter_policy}
+
+
+def get_policy(name):
+    """Return the bot policy with the given name, or a ScriptedPolicy if name is a replay file."""
+
+    if name in POLICIES:
+        return POLICIES[name]
+    if os.path.exists(name):
+        return ScriptedPolicy(name)
+    raise ValueError(f"Unknown policy {name!r}. Use one of {sorted(POLICIES)} or a replay file.")
+
+
+def settings_grid(grid):
+    """Expand a dictionary of setting name -> list of values into every combination of overrides."""
+
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def make_settings(overrides):
+    """Return headless Settings with the overrides applied."""
+
+    settings = Settings()
+    settings.headless_mode = True
+    for name, value in overrides.items():
+        if not hasattr(settings, name):
+            raise AttributeError(f"Settings has no attribute {name!r}")
+        setattr(settings, name, value)
+    return settings
+
+
+def run_game(overrides, policy_name, max_ticks):
+    """Play one headless game with the settings overrides and bot policy.
+       Returns a dictionary of results for the run."""
+
+    start = time.perf_counter()
+    policy = get_policy(policy_name)
+    ai_game = AlienInvasion(make_settings(overrides))
+    ai_game.start_game()
+
+    # Ticks taken to clear each level
+    level_ticks = []
+    level_start = 0
+    level = ai_game.stats.level
+    while ai_game.stats.game_active and ai_game.ticks < max_ticks:
+        ai_game.step(policy(ai_game))
+        if ai_game.stats.level != level:
+            level_ticks.append(ai_game.ticks - level_start)
+            level_start = ai_game.ticks
+            level = ai_game.stats.level
+
+    ticks_per_second = ai_game.settings.ticks_per_second
+    level_seconds = [ticks / ticks_per_second for ticks in level_ticks]
+    return dict(overrides,
+                policy=policy_name,
+                alien_fire_seed=ai_game.settings.alien_fire_seed,  # Sweep it (or set it) to replay this run exactly
+                level=ai_game.stats.level,
+                score=ai_game.stats.score,
+                ticks=ai_game.ticks,
+                game_over=not ai_game.stats.game_active,
+                mean_level_seconds=round(sum(level_seconds) / len(level_seconds), 2) if level_seconds else None,
+                level_seconds=";".join(f"{seconds:.2f}" for seconds in level_seconds),
+                run_seconds=round(time.perf_counter() - start, 3))
+
+
+def _run_game_star(arguments):
+    """Unpack the arguments for run_game (executor.map only passes one)."""
+    return run_game(*arguments)
+
+
+def run_sweep(configurations, policy_name='sweeper', max_ticks=100_000, repeats=1, workers=None):
+    """Play one game per settings configuration (repeated `repeats` times) across a pool of processes.
+       Returns the list of per-run results in the same order as the configurations."""
+
+    jobs = [(overrides, policy_name, max_ticks) for overrides in configurations for _ in range(repeats)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_run_game_star, jobs))
+
+
+def write_table(results, path):
+    """Write the results of a sweep to a CSV file, one row per run."""
+
+    fieldnames = []
+    for result in results:
+        fieldnames.extend(name for name in result if name not in fieldnames)
+    with open(path, 'w', newline='') as table_file:
+        writer = csv.DictWriter(table_file, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def main(argv):
+    """Run a parameter sweep from the command line."""
+
+    parser = argparse.ArgumentParser(
+        description="Play many headless games in parallel to tune the settings.",
+        epilog="Example: python sweep.py speedup_scale=1.1,1.2,1.3 bullets_allowed=3,5 --policy hunter")
+    parser.add_argument('grid', nargs='*', metavar='setting=v1,v2,...',
+                        help="Settings to sweep and the values to try")
+    parser.add_argument('--policy', default='sweeper',
+                        help=f"Bot playing the games: one of {sorted(POLICIES)}, or a replay file")
+    parser.add_argument('--max-ticks', type=int, default=100_000, help="Stop each game after this many ticks")
+    parser.add_argument('--repeats', type=int, default=1, help="Games to play per configuration")
+    parser.add_argument('--workers', type=int, default=None, help="Number of processes (default: one per core)")
+    parser.add_argument('--out', default='sweep_results.csv', help="CSV file to write the results to")
+    args = parser.parse_args(argv)
+
+    grid = {}
+    for item in args.grid:
+        name, _, values = item.partition('=')
+        grid[name] = [literal_eval(value) for value in values.split(',')]
+    get_policy(args.policy)  # Fail early on a bad policy name
+
+    configurations = settings_grid(grid)
+    start = time.perf_counter()
+    results = run_sweep(configurations, args.policy, args.max_ticks, args.repeats, args.workers)
+    write_table(results, args.out)
+    print(f"Played {len(results)} games in {time.perf_counter() - start:.1f} seconds. Results in {args.out}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,426 @@
+import sys
+import json
+import socket
+import asyncio
+import threading
+from collections import deque
+
+
+class NullTelemetry:
+    """Stand-in for TelemetryServer when streaming is switched off.  Nothing is captured or sent."""
+
+    def capture(self):
+        """Nothing to capture."""
+
+    def invalidate(self):
+        """Nothing to resend."""
+
+    def close(self):
+        """Nothing to stop."""
+
+
+class TelemetryServer(NullTelemetry):
+    """A class to stream the state of a game, tick by tick, to spectators on localhost.
+
+       The main loop only captures a few numbers per tick (capture), which are queued for
+       a background thread running an asyncio server.  That thread turns them into deltas
+       (ship x, bullets spawned and removed, aliens killed, fleet offset and column shifts,
+       score, level, lives)
+       and sends them to every connected client as JSON lines.
+
+       Nothing is captured while no one is watching.
+       A client starts with a keyframe of the whole board and then gets one delta per tick.
+       A client that can't keep up has its backlog thrown away and gets a fresh keyframe
+       instead, so it skips ticks rather than slowing the game or the other clients down.
+       See TelemetryClient for a client that reconstructs the board."""
+
+    def __init__(self, ai_game):
+        """Start the server thread on settings.telemetry_host and settings.telemetry_port."""
+
+        self.ai_game = ai_game
+        self.settings = ai_game.settings
+        self.captures = deque()  # Ticks captured by the main loop, waiting to be encoded
+        self.alien_count = 0     # Number of aliens at the last capture (to spot kills and new fleets)
+        self.relist = True       # List the living aliens at the next capture, even if their number is the same
+        self.watched = False     # True while at least one client is connected
+
+        # Sizes the clients need to lay out the board
+        self.hello = {'t': 'hello',
+                      'screen': [self.settings.screen_width, self.settings.screen_height],
+                      'ship': list(ai_game.ship.rect.size),
+                      'alien': list(self._alien_size()),
+                      'bullet': [self.settings.bullet_width, self.settings.bullet_height]}
+
+        # Board as of the last tick encoded, only touched by the server thread
+        self.board = None
+        self.clients = set()
+
+        self.loop = None  # Event loop of the server thread, once the server is listening
+        self.stopping = None
+        self.thread = threading.Thread(target=asyncio.run, args=(self._serve(),), name='telemetry', daemon=True)
+        self.thread.start()
+
+    def _alien_size(self):
+        """Return the width and height of an alien."""
+
+        if self.ai_game.array_fleet:
+            return self.ai_game.aliens.width, self.ai_game.aliens.height
+        alien = self.ai_game.alien_pool.acquire()
+        self.ai_game.alien_pool.release(alien)
+        return alien.rect.size
+
+    def capture(self):
+        """Queue the state of the game after a tick (called by the main loop, so kept minimal).
+           The living aliens are only listed when their number changed (or after invalidate)."""
+
+        if not self.watched:
+            return
+        ai_game = self.ai_game
+        aliens = ai_game.aliens
+        cells = None
+        if self.relist or len(aliens) != self.alien_count:
+            self.relist = False
+            self.alien_count = len(aliens)
+            cells = self._living_cells()
+        self.captures.append((ai_game.ticks, ai_game.ship.rect.x,
+                              [(bullet.serial, bullet.rect.x, bullet.y) for bullet in ai_game.bullets.sprites()],
+                              cells, self._fleet_offset(), self._column_shifts(),
+                              ai_game.stats.score, ai_game.stats.level, ai_game.stats.ships_left,
+                              ai_game.settings.bullet_speed * ai_game.tick_dt))
+
+    def invalidate(self):
+        """List the living aliens again at the next capture, e.g. after a new fleet or a restore."""
+        self.relist = True
+
+    def _living_cells(self):
+        """Return the (column, row) of every living alien."""
+
+        aliens = self.ai_game.aliens
+        if self.ai_game.array_fleet:
+            return list(zip(aliens.columns[aliens.alive].tolist(), aliens.rows[aliens.alive].tolist()))
+        return [(alien.column, alien.row) for alien in aliens.sprites()]
+
+    def _fleet_offset(self):
+        """Return how far the fleet has moved from where a new fleet starts, or None if it is empty.
+           The fleet moves rigidly, so one living alien tells where all of them are."""
+
+        ai_game = self.ai_game
+        if not ai_game.aliens:
+            return None
+        if ai_game.array_fleet:
+            fleet = ai_game.aliens
+            index = fleet.edges[0]
+            x, y, column, row = fleet.rect_x[index], fleet.rect_y[index], fleet.columns[index], fleet.rows[index]
+            width, height = fleet.width, fleet.height
+        else:
+            alien = ai_game.fleet_bounds.left_alien
+            x, y, column, row = alien.rect.x, alien.rect.y, alien.column, alien.row
+            width, height = alien.rect.size
+        # Same layout as AlienInvasion._create_alien
+        return int(x - width - 2 * width * column), int(y - height - 2 * height * row)
+
+    def _column_shifts(self):
+        """Return (column, pixels) for each column of the fleet that is not where the fleet offset puts it.
+           Each alien moves by adding to its own float x, so rounding can leave a whole column
+           a pixel off the rest of the fleet (every alien in a column starts at the same x, so they agree)."""
+
+        ai_game = self.ai_game
+        if not ai_game.aliens:
+            return ()
+        if ai_game.array_fleet:
+            fleet = ai_game.aliens
+            left = fleet.edges[0]
+            reference = fleet.rect_x[left] - fleet.width - 2 * fleet.width * fleet.columns[left]
+            columns = fleet.columns[fleet.alive]
+            offsets = fleet.rect_x[fleet.alive] - fleet.width - 2 * fleet.width * columns
+            off = offsets != reference
+            if not off.any():
+                return ()
+            return tuple(sorted(set(zip(columns[off].tolist(), (offsets[off] - reference).tolist()))))
+
+        left = ai_game.fleet_bounds.left_alien
+        width = left.rect.width
+        reference = left.rect.x - width - 2 * width * left.column
+        shifts = []
+        for column, aliens in ai_game.fleet_bounds.columns.items():
+            shift = next(iter(aliens)).rect.x - width - 2 * width * column - reference
+            if shift:
+                shifts.append((column, shift))
+        return tuple(sorted(shifts))
+
+    def close(self):
+        """Stop the server and disconnect the clients."""
+
+        # Nothing to stop if the server never started (e.g. the port was taken) or already stopped
+        if self.loop is not None and self.thread.is_alive():
+            self.loop.call_soon_threadsafe(self.stopping.set)
+            self.thread.join(timeout=1.0)
+
+    async def _serve(self):
+        """Accept clients and send them what the main loop captured, until closed."""
+
+        self.stopping = asyncio.Event()
+        try:
+            server = await asyncio.start_server(self._client_connected,
+                                                self.settings.telemetry_host, self.settings.telemetry_port)
+        except OSError as error:
+            print(f"Telemetry is off, could not listen on "
+                  f"{self.settings.telemetry_host}:{self.settings.telemetry_port}: {error}", file=sys.stderr)
+            return
+        self.loop = asyncio.get_running_loop()
+        async with server:
+            while not self.stopping.is_set():
+                self._send_captures()
+                try:
+                    await asyncio.wait_for(self.stopping.wait(), self.settings.telemetry_interval)
+                except asyncio.TimeoutError:
+                    pass
+        for client in list(self.clients):
+            client.writer.close()
+
+    async def _client_connected(self, reader, writer):
+        """Send a new client the board sizes and a keyframe, then the deltas as they come."""
+
+        # The first client starts the capture, and gets its keyframe once the aliens are next listed
+        if not self.clients:
+            self.captures.clear()
+            self.board = None
+            self.relist = True
+            self.watched = True
+
+        # Keep the operating system from buffering megabytes for a slow client, so it is noticed quickly
+        writer.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 64 * 1024)
+
+        client = _Client(writer, self.settings.telemetry_client_backlog)
+        client.send(_encode(self.hello) + self._keyframe())
+        self.clients.add(client)
+        try:
+            await client.run()
+        finally:
+            self.clients.discard(client)
+            self.watched = bool(self.clients)
+            writer.close()
+
+    def _send_captures(self):
+        """Turn the captured ticks into deltas and send them to every client."""
+
+        lines = []
+        while self.captures:
+            capture = self.captures.popleft()
+            if self.board is None and capture[3] is None:
+                continue  # Captured before the aliens were listed for the first client
+            delta = self._apply(capture)
+            lines.append(self._keyframe() if delta is None else _encode(delta))
+        if not lines or not self.clients:
+            return
+
+        data = b''.join(lines)
+        for client in self.clients:
+            if not client.send(data):
+                client.resync(_encode(self.hello) + self._keyframe())
+
+    def _apply(self, capture):
+        """Update the board with a captured tick. Returns the delta to send (None if it is the first)."""
+
+        tick, ship_x, bullets, cells, offset, shifts, score, level, lives, bullet_step = capture
+        board = self.board
+        if board is None:
+            # The first capture always lists the aliens, and becomes the keyframe for clients
+            self.board = {'tick': tick, 'ship': ship_x, 'bullets': {serial: [x, y] for serial, x, y in bullets},
+                          'aliens': set(cells), 'offset': offset, 'shifts': shifts, 'score': score, 'level': level,
+                          'lives': lives, 'bullet_step': bullet_step}
+            return None
+
+        delta = {'t': 'tick', 'tick': tick}
+        if ship_x != board['ship']:
+            delta['ship'] = board['ship'] = ship_x
+
+        # Bullets only move straight up by bullet_step, so only their spawns and removals are sent
+        if bullet_step != board['bullet_step']:
+            delta['bullet_step'] = board['bullet_step'] = bullet_step
+        old_bullets = board['bullets']
+        new_bullets = {serial: [x, y] for serial, x, y in bullets}
+        removed = [serial for serial in old_bullets if serial not in new_bullets]
+        spawned = [[serial, x, y] for serial, (x, y) in new_bullets.items() if serial not in old_bullets]
+        if removed:
+            delta['removed'] = removed
+        if spawned:
+            delta['spawned'] = spawned
+        board['bullets'] = new_bullets
+
+        # Aliens only ever disappear from a fleet, so any new alien means a whole new fleet
+        if cells is not None:
+            cells = set(cells)
+            if cells <= board['aliens']:
+                killed = board['aliens'] - cells
+                if killed:
+                    delta['killed'] = sorted(killed)
+            else:
+                delta['aliens'] = sorted(cells)
+            board['aliens'] = cells
+        if offset != board['offset']:
+            delta['offset'] = board['offset'] = offset
+        if shifts != board['shifts']:
+            board['shifts'] = shifts
+            delta['shifts'] = shifts
+
+        for name, value in (('score', score), ('level', level), ('lives', lives)):
+            if value != board[name]:
+                delta[name] = board[name] = value
+        board['tick'] = tick
+        return delta
+
+    def _keyframe(self):
+        """Return the whole board as an encoded keyframe (empty if nothing was captured yet)."""
+
+        board = self.board
+        if board is None:
+            return b''
+        return _encode({'t': 'key', 'tick': board['tick'], 'ship': board['ship'],
+                        'bullets': [[serial, x, y] for serial, (x, y) in board['bullets'].items()],
+                        'bullet_step': board['bullet_step'], 'aliens': sorted(board['aliens']),
+                        'offset': board['offset'], 'shifts': board['shifts'],
+                        'score': board['score'], 'level': board['level'],
+                        'lives': board['lives']})
+
+
+class _Client:
+    """A connected client of the TelemetryServer, with its own backlog of data waiting to be written."""
+
+    def __init__(self, writer, backlog):
+        """Initialize the client with room for backlog pieces of data waiting to be written."""
+
+        self.writer = writer
+        self.queue = asyncio.Queue(maxsize=backlog)
+
+    def send(self, data):
+        """Queue data to be written. Returns false if the client is too far behind to take it."""
+
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def resync(self, keyframe):
+        """Throw away the backlog and send the keyframe instead (the client skips those ticks)."""
+
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(keyframe)
+
+    async def run(self):
+        """Write the queued data until the client disconnects."""
+
+        try:
+            while True:
+                self.writer.write(await self.queue.get())
+                await self.writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+
+def _encode(message):
+    """Return a message as one compact line of JSON."""
+    return json.dumps(message, separators=(',', ':')).encode() + b'\n'
+
+
+class TelemetryClient:
+    """A reference client for TelemetryServer: rebuilds the board from the keyframes and deltas.
+
+       After each message the board holds the ship x, the bullets (serial id -> [x, y] of the rect),
+       the living aliens as (column, row) cells in the fleet, the fleet offset (plus the columns
+       shifted from it by rounding), score, level, and lives.
+       alien_rects() and bullet_rects() turn them into screen positions."""
+
+    def __init__(self):
+        """Initialize an empty board."""
+
+        self.sizes = None  # The server's hello message: screen, ship, alien, and bullet sizes
+        self.tick = None
+        self.ship = None
+        self.bullets = {}
+        self.bullet_step = 0.0
+        self.aliens = set()
+        self.offset = None
+        self.shifts = {}  # column -> pixels it is off the fleet offset
+        self.score = self.level = self.lives = None
+        self.keyframes = 0  # Number of keyframes received (more than one means ticks were skipped)
+
+    def apply(self, message):
+        """Update the board with one message from the server."""
+
+        kind = message['t']
+        if kind == 'hello':
+            self.sizes = message
+            return
+
+        if kind == 'key':
+            self.keyframes += 1
+            self.bullets = {serial: [x, y] for serial, x, y in message['bullets']}
+            self.aliens = set(map(tuple, message['aliens']))
+        else:
+            # Bullets in play moved up one step since the previous tick
+            step = message.get('bullet_step', self.bullet_step)
+            for position in self.bullets.values():
+                position[1] -= step
+            for serial in message.get('removed', ()):
+                del self.bullets[serial]
+            for serial, x, y in message.get('spawned', ()):
+                self.bullets[serial] = [x, y]
+            if 'aliens' in message:
+                self.aliens = set(map(tuple, message['aliens']))
+            self.aliens.difference_update(map(tuple, message.get('killed', ())))
+
+        self.tick = message['tick']
+        if 'shifts' in message:
+            self.shifts = dict(message['shifts'])
+        for name in ('ship', 'bullet_step', 'offset', 'score', 'level', 'lives'):
+            if name in message:
+                setattr(self, name, message[name])
+
+    def alien_rects(self):
+        """Return the (x, y) of every living alien on screen."""
+
+        if self.offset is None:
+            return []
+        width, height = self.sizes['alien']
+        dx, dy = self.offset
+        return sorted((width + 2 * width * column + dx + self.shifts.get(column, 0), height + 2 * height * row + dy)
+                      for column, row in self.aliens)
+
+    def bullet_rects(self):
+        """Return the (x, y) of every bullet on screen, rounded the way a Rect would be."""
+        return sorted((x, int(y + 0.5) if y >= 0 else -int(0.5 - y)) for x, y in self.bullets.values())
+
+    async def follow(self, host='127.0.0.1', port=8765, on_message=None):
+        """Connect to a server and keep the board up to date until the server goes away.
+           on_message(client) is called after every message."""
+
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.apply(json.loads(line))
+                if on_message:
+                    on_message(self)
+        finally:
+            writer.close()
+
+
+if __name__ == '__main__':
+    # Follow a game streamed with telemetry_port set, printing the board once a second of game time.
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    client = TelemetryClient()
+
+    def report(client):
+        if client.tick is not None and client.tick % 240 == 0:
+            print(f"tick {client.tick}: score {client.score}, level {client.level}, lives {client.lives}, "
+                  f"ship x {client.ship}, {len(client.aliens)} aliens, {len(client.bullets)} bullets")
+
+    try:
+        asyncio.run(client.follow(port=port, on_message=report))
+    except (ConnectionError, KeyboardInterrupt):
+        pass
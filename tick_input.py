@@ -0,0 +1,9 @@
+class TickInput:
+    """Static class of the bit flags describing the player's input during one tick of the game logic.
+       A tick's input is an int made by or-ing the flags together, e.g. TickInput.LEFT | TickInput.FIRE."""
+
+    NONE = 0
+    FIRE = 1   # Spacebar pressed to fire a bullet
+    LEFT = 2   # Left arrow held down
+    RIGHT = 4  # Right arrow held down
+    START = 8  # A new game was started just before this tick
@@ -0,0 +1,237 @@
+import numpy as np
+from settings import Settings
+from assets import Assets
+from fleet import round_like_rect
+from tick_input import TickInput
+
+
+class VectorAlienInvasion:
+    """A class to play many independent headless games in lock-step, for training agents.
+
+       Every game's state (ship, bullets, fleet, score, level, ships left) is stored in NumPy arrays
+       with one row per game, so a step of all the games is a handful of vectorized operations.
+       The rules are the same as AlienInvasion: bullets and aliens collide like groupcollide,
+       clearing the fleet advances the level like Settings.increase_speed, and losing a ship
+       restarts the level or ends the game like _ship_lost.  The aliens don't fire back.
+       Given the same inputs, each game plays out exactly like a headless AlienInvasion game
+       with the sprite fleet, alien_fire_rates = (0.0,), and rect collisions.
+
+       Actions are TickInput flags (LEFT, RIGHT, FIRE), one per game.
+       Games that end are automatically restarted on the next step."""
+
+    def __init__(self, num_envs, settings=None):
+        """Initialize num_envs games using the settings (the default settings if None)."""
+
+        self.num_envs = num_envs
+        self.settings = settings if settings else Settings()
+        self.tick_dt = self.settings.reference_fps / self.settings.ticks_per_second
+
+        # Starting values of the settings that change throughout a game
+        start = Settings()
+        start.__dict__.update(self.settings.__dict__)
+        start.initialize_dynamic_settings()
+        self.start_speeds = (start.ship_speed, start.bullet_speed, start.alien_speed)
+        self.start_points = start.alien_points
+
+        # Sizes of the sprites (same images as the game)
+        self.screen_width = self.settings.screen_width
+        self.screen_height = self.settings.screen_height
+        self.ship_width, self.ship_height = Assets.image('images/ship.bmp').get_size()
+        self.alien_width, self.alien_height = Assets.image('images/alien.bmp').get_size()
+        self.bullet_width = self.settings.bullet_width
+        self.bullet_height = self.settings.bullet_height
+        self.ship_top = self.screen_height - self.ship_height
+
+        # Starting positions of the fleet, laid out the same way as AlienInvasion._create_fleet
+        number_columns = (self.screen_width - 2 * self.alien_width) // (2 * self.alien_width)
+        available_space_y = self.screen_height - (3 * self.alien_height) - self.ship_height
+        number_rows = available_space_y // (2 * self.alien_height)
+        columns = np.tile(np.arange(number_columns), number_rows)
+        rows = np.repeat(np.arange(number_rows), number_columns)
+        self.fleet_start_x = self.alien_width + 2 * self.alien_width * columns
+        self.fleet_start_y = self.alien_height + 2 * self.alien_height * rows
+        self.num_aliens = self.fleet_start_x.size
+
+        # Allocate the state of every game
+        n, b, a = num_envs, self.settings.bullets_allowed, self.num_aliens
+        self.ship_x = np.zeros(n)
+        self.ship_rect_x = np.zeros(n, dtype=np.int64)
+        self.bullet_y = np.zeros((n, b))
+        self.bullet_rect_x = np.zeros((n, b), dtype=np.int64)
+        self.bullet_rect_y = np.zeros((n, b), dtype=np.int64)
+        self.bullet_alive = np.zeros((n, b), dtype=bool)
+        self.bullet_order = np.zeros((n, b), dtype=np.int64)  # When each bullet was fired
+        self.alien_x = np.zeros((n, a))
+        self.alien_rect_x = np.zeros((n, a), dtype=np.int64)
+        self.alien_rect_y = np.zeros((n, a), dtype=np.int64)
+        self.alien_alive = np.zeros((n, a), dtype=bool)
+        self.fleet_direction = np.ones(n)
+        self.ship_speed = np.zeros(n)
+        self.bullet_speed = np.zeros(n)
+        self.alien_speed = np.zeros(n)
+        self.alien_points = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.level = np.ones(n, dtype=np.int64)
+        self.ships_left = np.zeros(n, dtype=np.int64)
+        self.shots_fired = 0  # Counter used to order the bullets
+
+        self.reset()
+
+    def reset(self, envs=None):
+        """Start new games in the given envs (a boolean mask or indices, all of them if None).
+           Returns the observations of every game."""
+
+        envs = np.arange(self.num_envs) if envs is None else envs
+
+        # Same as AlienInvasion.start_game
+        self.fleet_direction[envs] = 1.0
+        self.ship_speed[envs], self.bullet_speed[envs], self.alien_speed[envs] = self.start_speeds
+        self.alien_points[envs] = self.start_points
+        self.ships_left[envs] = self.settings.ship_limit
+        self.score[envs] = 0
+        self.level[envs] = 1
+        self._reset_sprites(envs)
+        return self.observe()
+
+    def _reset_sprites(self, envs):
+        """Create a new fleet, clear the bullets, and center the ship (AlienInvasion._reset_sprites)."""
+
+        self.alien_rect_x[envs] = self.fleet_start_x
+        self.alien_rect_y[envs] = self.fleet_start_y
+        self.alien_x[envs] = self.fleet_start_x
+        self.alien_alive[envs] = True
+        self.bullet_alive[envs] = False
+        self.ship_rect_x[envs] = self.screen_width // 2 - self.ship_width // 2
+        self.ship_x[envs] = self.ship_rect_x[envs]
+
+    def step(self, actions):
+        """Advance every game by one tick using an array of TickInput flags, one per game.
+           Returns the observations, the rewards (points scored), and the done flags (game over)."""
+
+        actions = np.asarray(actions)
+        score_before = self.score.copy()
+
+        self._fire_bullets(actions & TickInput.FIRE != 0)
+        self._update_ships(actions & TickInput.RIGHT != 0, actions & TickInput.LEFT != 0)
+        self._update_bullets()
+        self._check_bullet_alien_collisions()
+        dones = self._update_aliens()
+
+        rewards = (self.score - score_before).astype(np.float64)
+        if dones.any():
+            self.reset(np.flatnonzero(dones))
+        return self.observe(), rewards, dones
+
+    def _fire_bullets(self, firing):
+        """Add a bullet at the ship in the games that fire and have fewer than the max bullets."""
+
+        firing = firing & ~self.bullet_alive.all(axis=1)
+        envs = np.flatnonzero(firing)
+        if not envs.size:
+            return
+        slots = np.argmin(self.bullet_alive[envs], axis=1)  # First free slot
+
+        # Bullet rect's midtop is the ship rect's midtop
+        ship_centerx = self.ship_rect_x[envs] + self.ship_width // 2
+        self.bullet_rect_x[envs, slots] = ship_centerx - self.bullet_width // 2
+        self.bullet_rect_y[envs, slots] = self.ship_top
+        self.bullet_y[envs, slots] = self.ship_top
+        self.bullet_alive[envs, slots] = True
+        self.bullet_order[envs, slots] = self.shots_fired + np.arange(envs.size)
+        self.shots_fired += envs.size
+
+    def _update_ships(self, moving_right, moving_left):
+        """Move the ships based on the movement flags (Ship.update)."""
+
+        right = moving_right & (self.ship_rect_x + self.ship_width < self.screen_width)
+        left = moving_left & (self.ship_rect_x > 0)
+        step = self.ship_speed * self.tick_dt
+        self.ship_x[right] += step[right]
+        self.ship_x[left] -= step[left]
+        self.ship_rect_x = round_like_rect(self.ship_x)
+
+    def _update_bullets(self):
+        """Move the bullets up and get rid of the ones past the top of the screen."""
+
+        self.bullet_y -= (self.bullet_speed * self.tick_dt)[:, None]
+        self.bullet_rect_y = round_like_rect(self.bullet_y)
+        self.bullet_alive &= self.bullet_rect_y + self.bullet_height > 0
+
+    def _check_bullet_alien_collisions(self):
+        """Remove the bullets and aliens that collide, score the hits, and advance the level
+           of the games whose fleet is destroyed."""
+
+        envs = np.arange(self.num_envs)
+        alien_right = self.alien_rect_x + self.alien_width
+        alien_bottom = self.alien_rect_y + self.alien_height
+
+        # Resolve the bullets in the order they were fired, like groupcollide does
+        order = np.argsort(np.where(self.bullet_alive, self.bullet_order, np.iinfo(np.int64).max), axis=1)
+        for rank in range(order.shape[1]):
+            slots = order[:, rank]
+            alive = self.bullet_alive[envs, slots]
+            if not alive.any():
+                break
+            left = self.bullet_rect_x[envs, slots][:, None]
+            top = self.bullet_rect_y[envs, slots][:, None]
+            hits = (self.alien_alive & alive[:, None]
+                    & (self.alien_rect_x < left + self.bullet_width) & (alien_right > left)
+                    & (self.alien_rect_y < top + self.bullet_height) & (alien_bottom > top))
+            number_hit = hits.sum(axis=1)
+            self.alien_alive &= ~hits
+            self.bullet_alive[envs, slots] &= number_hit == 0
+            self.score += self.alien_points * number_hit
+
+        # Repopulate fleet and advance the level if there are no aliens left (Settings.increase_speed)
+        cleared = np.flatnonzero(~self.alien_alive.any(axis=1))
+        if cleared.size:
+            self.level[cleared] += 1
+            self.ship_speed[cleared] *= self.settings.speedup_scale
+            self.bullet_speed[cleared] *= self.settings.speedup_scale
+            self.alien_speed[cleared] *= self.settings.speedup_scale
+            self.alien_points[cleared] = (self.alien_points[cleared] * self.settings.score_scale).astype(np.int64)
+            self._reset_sprites(cleared)
+
+    def _update_aliens(self):
+        """Move the fleets, drop them at the edges, and check for ships lost.
+           Returns the games that are over."""
+
+        self.alien_x += (self.alien_speed * self.fleet_direction * self.tick_dt)[:, None]
+        self.alien_rect_x = round_like_rect(self.alien_x)
+
+        # Change direction and move the fleet down if any alien touches an edge
+        at_edge = (((self.alien_rect_x + self.alien_width >= self.screen_width) | (self.alien_rect_x <= 0))
+                   & self.alien_alive).any(axis=1)
+        self.fleet_direction[at_edge] *= -1
+        self.alien_rect_y[at_edge] += self.settings.fleet_drop_speed
+
+        # Look for ship/alien collisions, then aliens hitting the bottom of the screen
+        hit_ship = (self.alien_alive
+                    & (self.alien_rect_x < (self.ship_rect_x + self.ship_width)[:, None])
+                    & (self.alien_rect_x + self.alien_width > self.ship_rect_x[:, None])
+                    & (self.alien_rect_y < self.screen_height)
+                    & (self.alien_rect_y + self.alien_height > self.ship_top)).any(axis=1)
+        at_bottom = ((self.alien_rect_y + self.alien_height >= self.screen_height) & self.alien_alive).any(axis=1)
+        ship_lost = hit_ship | at_bottom
+
+        # Restart the level with one less ship, or end the game when there are none left
+        dones = ship_lost & (self.ships_left == 0)
+        replaced = np.flatnonzero(ship_lost & ~dones)
+        if replaced.size:
+            self.ships_left[replaced] -= 1
+            self._reset_sprites(replaced)
+        return dones
+
+    def observe(self):
+        """Return the state of every game as a dictionary of arrays with one row per game."""
+
+        return {'ship_x': self.ship_rect_x.copy(),
+                'bullet_x': np.where(self.bullet_alive, self.bullet_rect_x, -1),
+                'bullet_y': np.where(self.bullet_alive, self.bullet_rect_y, -1),
+                'bullet_alive': self.bullet_alive.copy(),
+                'alien_x': self.alien_rect_x.copy(),
+                'alien_y': self.alien_rect_y.copy(),
+                'alien_alive': self.alien_alive.copy(),
+                'score': self.score.copy(),
+                'level': self.level.copy(),
+                'ships_left': self.ships_left.copy()}